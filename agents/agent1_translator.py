@@ -3,37 +3,58 @@ Agent 1: Medical Translator
 ===========================
 Translates medical reports into simple language.
 Model: llama-3.3-70b-versatile (best medical reasoning)
+
+Inputs whose findings are all recognized (translator_rules.py) are
+answered from rules without calling the model.
 """
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from llm import client
+from llm import chat, stream_chat
 from profile_manager import get_profile, format_profile
+from lab_parser import parse_lab_values, format_lab_table, unparsed_lines, UNIT_RE
+from translator_rules import translate_fast
 
+MODEL = "llama-3.3-70b-versatile"
+TEMPERATURE = 0.7
+MAX_TOKENS = 1000
+# Set AGENT1_RULES_DISABLED=1 to always call the LLM (e.g. when benchmarking it)
+RULES_ENABLED = os.getenv("AGENT1_RULES_DISABLED", "").lower() not in ("1", "true", "yes")
 
-def run_agent1(medical_text):
-    """
-    Translate medical report into simple language.
-    
-    Args:
-        medical_text: Raw medical report text
-        
-    Returns:
-        Simple explanation (150-200 words)
-    """
+
+def _build_prompt(medical_text, profile=None):
+    """Build the Agent 1 prompt for the given (or current session) profile."""
     
-    profile = get_profile()
+    if profile is None:
+        profile = get_profile()
     profile_str = format_profile(profile) if profile else ""
     
+    # Send the extracted lab values instead of a long document - alone only
+    # if the report holds nothing else (no impression, diagnosis, other
+    # measurement), else with the lines they don't cover
+    report_title = "MEDICAL REPORT"
+    values = parse_lab_values(medical_text)
+    lab_table = format_lab_table(values)
+    rest = unparsed_lines(medical_text, values) if lab_table else []
+    if lab_table and not rest and len(UNIT_RE.findall(medical_text)) <= len(values):
+        if len(lab_table) * 2 < len(medical_text):
+            report_title = "LAB VALUES (extracted from the report)"
+            medical_text = lab_table
+    elif rest:
+        compact = f"Lab values (extracted):\n{lab_table}\n\nRest of the report:\n" + "\n".join(rest)
+        if len(compact) < len(medical_text):
+            report_title = "MEDICAL REPORT (lab values extracted)"
+            medical_text = compact
+    
     prompt = f"""
 You are a medical translator. Explain this medical report in SIMPLE language.
 
 USER PROFILE:
 {profile_str}
 
-MEDICAL REPORT:
+{report_title}:
 {medical_text}
 
 INSTRUCTIONS:
@@ -59,17 +80,63 @@ FORMAT YOUR RESPONSE EXACTLY LIKE THIS:
 
 Keep it friendly, reassuring, and easy to understand.
 """
+    return prompt
+
+
+def run_agent1(medical_text, profile=None):
+    """
+    Translate medical report into simple language.
+    
+    Args:
+        medical_text: Raw medical report text
+        profile: User profile dict (defaults to the session profile)
+        
+    Returns:
+        Simple explanation (150-200 words)
+    """
     
     print("🔄 Agent 1: Translating medical report...")
     
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_tokens=1000
+    result = translate_fast(medical_text) if RULES_ENABLED else None
+    if result:
+        print("⚡ Agent 1: Translated from rules (no LLM call)")
+        return result
+    
+    result = chat(
+        model=MODEL,
+        messages=[{"role": "user", "content": _build_prompt(medical_text, profile)}],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        agent="agent1"
     )
     
-    result = response.choices[0].message.content
     print("✅ Agent 1: Translation complete!")
     
     return result
+
+
+def stream_agent1(medical_text, profile=None):
+    """
+    Streaming version of run_agent1 (same arguments).
+    
+    Yields:
+        Text deltas of the translation as the model generates them
+    """
+    
+    print("🔄 Agent 1: Translating medical report (streaming)...")
+    
+    result = translate_fast(medical_text) if RULES_ENABLED else None
+    if result:
+        print("⚡ Agent 1: Translated from rules (no LLM call)")
+        yield result
+        return
+    
+    yield from stream_chat(
+        model=MODEL,
+        messages=[{"role": "user", "content": _build_prompt(medical_text, profile)}],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        agent="agent1"
+    )
+    
+    print("✅ Agent 1: Translation complete!")
@@ -3,28 +3,46 @@ Agent 2: Diet Recommender
 =========================
 Recommends diet based on health condition + user profile.
 Model: llama-3.3-70b-versatile (deep diet logic)
+
+Two output modes:
+- run_agent2: markdown sections
+- run_agent2_structured / stream_agent2_structured: JSON validated
+  against DIET_SCHEMA, so the UI, PDF and condition detection read
+  fields instead of scraping prose. The streaming version yields the
+  fields as they are completed, so the UI can show progress.
 """
 
 import sys
 import os
+import re
+import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from llm import client
+from llm import chat, stream_chat
 from profile_manager import get_profile, format_profile
+from diet_format import DIET_SCHEMA, format_diet
 
+MODEL = "llama-3.3-70b-versatile"
+TEMPERATURE = 0.6
+MAX_TOKENS = 2000
 
-def run_agent2(simple_explanation):
-    """
-    Recommend diet based on health condition and user preferences.
-    
-    Args:
-        simple_explanation: Output from Agent 1
-        
-    Returns:
-        Diet recommendations with foods to eat/avoid
-    """
+# Minimum list lengths before a field counts as valid
+MIN_ITEMS = {"foods_include": 5, "foods_avoid": 5, "nutrients": 1, "tips": 2}
+
+# Safety rules shared by the markdown and JSON prompts
+STRICT_RULES = """⚠️ STRICT RULES:
+- NEVER recommend foods the user is allergic to (dangerous!)
+- NEVER recommend meat/fish for vegetarians/vegans
+- NEVER recommend beef for Hindus, pork for Muslims
+- AVOID foods the user dislikes
+- Consider cooking time and budget preferences"""
+
+
+def _build_prompt(simple_explanation, profile=None):
+    """Build the Agent 2 prompt for the given (or current session) profile."""
     
-    profile = get_profile()
+    if profile is None:
+        profile = get_profile()
     profile_str = format_profile(profile) if profile else ""
     
     prompt = f"""
@@ -36,12 +54,7 @@ USER PROFILE:
 HEALTH EXPLANATION:
 {simple_explanation}
 
-⚠️ STRICT RULES:
-- NEVER recommend foods the user is allergic to (dangerous!)
-- NEVER recommend meat/fish for vegetarians/vegans
-- NEVER recommend beef for Hindus, pork for Muslims
-- AVOID foods the user dislikes
-- Consider cooking time and budget preferences
+{STRICT_RULES}
 
 Provide recommendations with these sections:
 
@@ -75,17 +88,259 @@ Water and fluid recommendations.
 
 REMEMBER: All recommendations must respect the user's dietary profile!
 """
+    return prompt
+
+
+def run_agent2(simple_explanation, profile=None):
+    """
+    Recommend diet based on health condition and user preferences.
+    
+    Args:
+        simple_explanation: Output from Agent 1
+        profile: User profile dict (defaults to the session profile)
+        
+    Returns:
+        Diet recommendations with foods to eat/avoid
+    """
     
     print("🔄 Agent 2: Creating diet recommendations...")
     
-    response = client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.6,
-        max_tokens=2000
+    result = chat(
+        model=MODEL,
+        messages=[{"role": "user", "content": _build_prompt(simple_explanation, profile)}],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        agent="agent2"
     )
     
-    result = response.choices[0].message.content
     print("✅ Agent 2: Diet recommendations complete!")
     
     return result
+
+
+# ============================================================
+# STRUCTURED (JSON) MODE
+# ============================================================
+
+_FIELD_HINTS = {
+    "diet_name": "Name of the diet approach (e.g. DASH Diet)",
+    "why": "2-3 sentences explaining why",
+    "foods_include": "10-15 specific foods",
+    "foods_avoid": "10-15 specific foods",
+    "meal_timing": "When and how often to eat",
+    "nutrients": "Most important nutrients for this condition",
+    "hydration": "Water and fluid recommendations",
+    "tips": "3-5 practical lifestyle tips",
+}
+
+
+def _json_shape(fields):
+    """Example JSON object for the prompt (lists shown as arrays)."""
+    return json.dumps(
+        {f: [_FIELD_HINTS[f]] if DIET_SCHEMA[f][0] is list else _FIELD_HINTS[f] for f in fields},
+        indent=2
+    )
+
+
+_LIST_SPLIT = re.compile(r"\s*(?:\n|;|,(?![^()]*\)))\s*")
+_BULLET = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)])\s*")
+
+
+def _build_json_prompt(simple_explanation, profile=None, fields=None, current=None):
+    """Prompt for JSON output - all fields, or only `fields` when repairing."""
+    
+    if profile is None:
+        profile = get_profile()
+    profile_str = format_profile(profile) if profile else ""
+    
+    if fields:
+        task = f"""Some fields of an earlier answer were missing or malformed.
+Respond with ONLY a JSON object containing these fields:
+{_json_shape(fields)}
+
+ALREADY DECIDED (stay consistent with it):
+{json.dumps(current or {}, ensure_ascii=False)}"""
+    else:
+        task = f"""Respond with ONLY a JSON object of this shape:
+{_json_shape(DIET_SCHEMA)}"""
+    
+    return f"""
+You are a clinical nutritionist. Create diet recommendations.
+
+USER PROFILE:
+{profile_str}
+
+HEALTH EXPLANATION:
+{simple_explanation}
+
+{STRICT_RULES}
+
+{task}
+"""
+
+
+def _parse_json(text):
+    """Parse a JSON object from model output (tolerates code fences / chatter)."""
+    try:
+        data = json.loads(text)
+    except (TypeError, ValueError):
+        start, end = (text or "").find("{"), (text or "").rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError:
+            return {}
+    return data if isinstance(data, dict) else {}
+
+
+def validate_diet(data):
+    """
+    Check each field against DIET_SCHEMA, fixing what can be fixed locally
+    (string <-> list coercion, bullet stripping).
+    
+    Returns:
+        (clean dict, list of field names that are still invalid)
+    """
+    clean, invalid = {}, []
+    
+    for field, (kind, _) in DIET_SCHEMA.items():
+        value = data.get(field)
+        
+        if kind is list:
+            if isinstance(value, str):
+                value = _LIST_SPLIT.split(value)
+            if isinstance(value, list):
+                value = [_BULLET.sub("", str(v)).strip() for v in value if isinstance(v, (str, int, float))]
+                value = [v for v in value if v]
+            if not isinstance(value, list) or len(value) < MIN_ITEMS.get(field, 1):
+                invalid.append(field)
+                value = value if isinstance(value, list) else []
+        else:
+            if isinstance(value, list):
+                value = " ".join(str(v) for v in value)
+            if not isinstance(value, str) or not value.strip():
+                invalid.append(field)
+                value = ""
+            value = value.strip()
+        
+        clean[field] = value
+    
+    return clean, invalid
+
+
+def _repair(simple_explanation, profile, data, invalid):
+    """
+    Ask again for the invalid fields only (one follow-up call).
+    
+    Returns:
+        data with the repaired fields (fields that are still invalid keep
+        what validate_diet salvaged, e.g. a list shorter than MIN_ITEMS,
+        or stay empty)
+    """
+    print(f"⚠️ Agent 2: Repairing fields: {', '.join(invalid)}")
+    current = {k: v for k, v in data.items() if k not in invalid}
+    raw = chat(
+        model=MODEL,
+        messages=[{"role": "user", "content": _build_json_prompt(simple_explanation, profile, invalid, current)}],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        agent="agent2",
+        response_format={"type": "json_object"}
+    )
+    repaired, _ = validate_diet(dict(data, **_parse_json(raw)))
+    return {k: (repaired[k] if k in invalid else v) for k, v in data.items()}
+
+
+def run_agent2_structured(simple_explanation, profile=None):
+    """
+    Recommend a diet as validated structured data.
+    
+    Invalid fields are repaired with one targeted follow-up call that asks
+    only for those fields; anything still invalid keeps what could be
+    salvaged (e.g. a short list) or is left empty.
+    
+    Args:
+        simple_explanation: Output from Agent 1
+        profile: User profile dict (defaults to the session profile)
+        
+    Returns:
+        dict with the DIET_SCHEMA fields
+    """
+    
+    print("🔄 Agent 2: Creating diet recommendations (JSON)...")
+    
+    raw = chat(
+        model=MODEL,
+        messages=[{"role": "user", "content": _build_json_prompt(simple_explanation, profile)}],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        agent="agent2",
+        response_format={"type": "json_object"}
+    )
+    data, invalid = validate_diet(_parse_json(raw))
+    
+    if invalid:
+        data = _repair(simple_explanation, profile, data, invalid)
+    
+    print("✅ Agent 2: Diet recommendations complete!")
+    
+    return data
+
+
+def stream_agent2_structured(simple_explanation, profile=None):
+    """
+    Streaming version of run_agent2_structured (same arguments).
+    
+    The JSON is streamed; every time a top-level field has been completed
+    the fields so far are yielded (cleaned up by validate_diet, missing
+    ones empty), so the UI can render them.
+    
+    Yields:
+        Partial diet dicts, then the validated (and repaired) dict last
+    """
+    
+    print("🔄 Agent 2: Creating diet recommendations (JSON, streaming)...")
+    
+    raw = ""
+    depth, in_string, escaped = 0, False, False
+    for delta in stream_chat(
+        model=MODEL,
+        messages=[{"role": "user", "content": _build_json_prompt(simple_explanation, profile)}],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        agent="agent2",
+        response_format={"type": "json_object"}
+    ):
+        field_end = None  # where the last top-level field completed in this delta ends
+        for i, ch in enumerate(delta):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch in "{[":
+                depth += 1
+            elif ch in "}]":
+                depth -= 1
+            elif ch == "," and depth == 1:
+                field_end = len(raw) + i
+        raw += delta
+        if field_end is not None:
+            # Close the object after the last complete field
+            partial = _parse_json(raw[:field_end] + "}")
+            if partial:
+                yield validate_diet(partial)[0]
+    
+    data, invalid = validate_diet(_parse_json(raw))
+    
+    if invalid:
+        data = _repair(simple_explanation, profile, data, invalid)
+    
+    print("✅ Agent 2: Diet recommendations complete!")
+    
+    yield data
@@ -9,22 +9,19 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from llm import client
+from llm import chat, stream_chat
 from profile_manager import get_profile, format_profile
 
+MODEL = "llama-3.1-8b-instant"
+TEMPERATURE = 0.8
+MAX_TOKENS = 3000
 
-def run_agent3(diet_recommendations):
-    """
-    Create 7-day meal plan based on diet recommendations.
-    
-    Args:
-        diet_recommendations: Output from Agent 2
-        
-    Returns:
-        7-day meal plan with recipes and shopping list
-    """
+
+def _build_prompt(diet_recommendations, profile=None):
+    """Build the Agent 3 prompt for the given (or current session) profile."""
     
-    profile = get_profile()
+    if profile is None:
+        profile = get_profile()
     profile_str = format_profile(profile) if profile else ""
     
     prompt = f"""
@@ -85,17 +82,52 @@ FORMAT YOUR RESPONSE EXACTLY LIKE THIS:
 
 Keep it practical and respect ALL user restrictions!
 """
+    return prompt
+
+
+def run_agent3(diet_recommendations, profile=None):
+    """
+    Create 7-day meal plan based on diet recommendations.
+    
+    Args:
+        diet_recommendations: Output from Agent 2
+        profile: User profile dict (defaults to the session profile)
+        
+    Returns:
+        7-day meal plan with recipes and shopping list
+    """
     
     print("🔄 Agent 3: Creating 7-day meal plan...")
     
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.8,
-        max_tokens=3000
+    result = chat(
+        model=MODEL,
+        messages=[{"role": "user", "content": _build_prompt(diet_recommendations, profile)}],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        agent="agent3"
     )
     
-    result = response.choices[0].message.content
     print("✅ Agent 3: Meal plan complete!")
     
     return result
+
+
+def stream_agent3(diet_recommendations, profile=None):
+    """
+    Streaming version of run_agent3 (same arguments).
+    
+    Yields:
+        Text deltas of the meal plan as the model generates them
+    """
+    
+    print("🔄 Agent 3: Creating 7-day meal plan (streaming)...")
+    
+    yield from stream_chat(
+        model=MODEL,
+        messages=[{"role": "user", "content": _build_prompt(diet_recommendations, profile)}],
+        temperature=TEMPERATURE,
+        max_tokens=MAX_TOKENS,
+        agent="agent3"
+    )
+    
+    print("✅ Agent 3: Meal plan complete!")
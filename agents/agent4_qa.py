@@ -9,23 +9,25 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from llm import client
+from llm import chat
 from profile_manager import get_profile, format_profile
 
 
-def run_agent4(question, diet_plan=None):
+def run_agent4(question, diet_plan=None, profile=None):
     """
     Answer user questions about diet and nutrition.
     
     Args:
         question: User's question
         diet_plan: Their diet recommendations (optional context)
+        profile: User profile dict (defaults to the session profile)
         
     Returns:
         Concise, personalized answer
     """
     
-    profile = get_profile()
+    if profile is None:
+        profile = get_profile()
     profile_str = format_profile(profile) if profile else ""
     
     diet_section = ""
@@ -57,14 +59,14 @@ ANSWER:
     
     print("🔄 Agent 4: Answering question...")
     
-    response = client.chat.completions.create(
+    result = chat(
         model="llama-3.1-8b-instant",
         messages=[{"role": "user", "content": prompt}],
         temperature=0.7,
-        max_tokens=500
+        max_tokens=500,
+        agent="agent4"
     )
     
-    result = response.choices[0].message.content
     print("✅ Agent 4: Answer ready!")
     
     return result
@@ -10,11 +10,11 @@ import streamlit.components.v1 as components
 import sys
 import os
 import base64
-from datetime import datetime
-from fpdf import FPDF
+import json
+import hashlib
 import tempfile
+from datetime import datetime
 import pandas as pd
-import re
 
 # Streamlit Extras for enhanced UI
 try:
@@ -72,7 +72,8 @@ st.set_page_config(
 
 # ============== IMPORTS ==============
 from profile_manager import get_profile, save_profile, delete_profile, has_profile
-from report_manager import save_report, load_reports, get_stats, delete_report
+from report_manager import save_report, list_reports, get_report, get_stats, delete_report
+from pdf_renderer import generate_pdf, render_thumbnails
 
 # ============== SESSION STATE ==============
 if 'current_page' not in st.session_state:
@@ -88,151 +89,145 @@ if 'medical_text' not in st.session_state:
 @st.cache_data(ttl=300, show_spinner=False)
 def process_report(text):
     """Run all agents on medical report. Cached for 5 minutes."""
-    from agent1_translator import run_agent1
-    from agent2_recommender import run_agent2
-    from agent3_meal_planner import run_agent3
-    
-    translation = run_agent1(text)
-    diet_rec = run_agent2(translation)
-    meal_plan = run_agent3(diet_rec)
-    
-    return {
-        "translation": translation,
-        "diet": diet_rec,
-        "meal_plan": meal_plan
-    }
-
-def clean_text(text):
-    """Clean text for PDF."""
-    if not text:
-        return ""
-    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'\*(.+?)\*', r'\1', text)
-    for bad, good in {"–": "-", "—": "-", """: '"', """: '"', "'": "'", "'": "'", "•": "-"}.items():
-        text = text.replace(bad, good)
-    return text.encode('ascii', 'ignore').decode('ascii').strip()
-
-class StyledPDF(FPDF):
-    """Custom PDF with borders and page numbers on ALL pages."""
-    
-    def __init__(self, profile=None):
-        super().__init__()
-        self.profile = profile
-    
-    def header(self):
-        # Draw border on EVERY page (including auto-generated overflow pages)
-        self.set_draw_color(46, 125, 50)  # Green border
-        self.set_line_width(0.5)
-        self.rect(10, 10, 190, 277)  # Full page border
+    from pipeline import run_pipeline
+    return run_pipeline(text)
+
+def report_content_hash(results, profile=None):
+    """Content hash of a report's texts + profile (key for the PDF cache)."""
+    h = hashlib.sha256()
+    for part in (
+        results.get("translation") or "",
+        results.get("diet") or "",
+        results.get("meal_plan") or "",
+        json.dumps(results.get("diet_data"), sort_keys=True),
+        json.dumps(profile or {}, sort_keys=True)
+    ):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def cached_pdf(content_hash, _results, _profile=None):
+    """PDF bytes for a report. Keyed only by content_hash; keeps at most 20 PDFs."""
+    return generate_pdf(_results, _profile)
+
+def condition_chart_data(stats):
+    """Bar chart DataFrame for the stats, kept in the session until stats["version"] changes."""
+    cached = st.session_state.get("condition_chart")
+    if cached and cached[0] == stats.get("version"):
+        return cached[1]
+    conditions_df = pd.DataFrame([
+        {"Condition": k, "Count": v}
+        for k, v in stats.get("condition_counts", {}).items()
+    ])
+    st.session_state.condition_chart = (stats.get("version"), conditions_df)
+    return conditions_df
+
+REPORTS_PER_PAGE = 10
+
+def export_history(export_format, include_pdfs=False, profile=None):
+    """
+    Whole report history as JSONL or ZIP bytes.
+    
+    The archive is built in a temp file one report at a time, but
+    st.download_button keeps whatever it serves in memory, so the
+    download itself holds the whole archive - the report_archive CLI
+    is the constant-memory path for large histories.
+    """
+    from report_archive import export_jsonl, export_zip
+    with tempfile.TemporaryFile() as out:
+        if export_format == "ZIP":
+            export_zip(out, pdf=include_pdfs, profile=profile, workers=os.cpu_count() or 1)
+        else:
+            export_jsonl(out)
+        out.seek(0)
+        return out.read()
+
+@st.fragment
+def render_history_item(summary, profile, expanded=False):
+    """
+    One Dashboard history entry. The full report is only loaded while the
+    expander is open, only the selected tab is rendered, and opening or
+    closing reruns just this entry.
+    """
+    date = summary.get("date", "Unknown")
+    time_str = summary.get("time", "")
+    conditions = summary.get("conditions_found") or ["General"]
+    report_id = summary.get("report_id", 0)
+    
+    expander = st.expander(f"{date} {time_str} — {', '.join(conditions[:3])}", expanded=expanded,
+                           key=f"history_{report_id}", on_change="rerun")
+    with expander:
+        if not expander.open:
+            return
+        report = get_report(report_id)
+        if report is None:
+            st.info("This report was deleted.")
+            return
         
-        # Green header bar
-        self.set_fill_color(46, 125, 50)  # Green
-        self.rect(10, 10, 190, 12, 'F')
+        tab1, tab2, tab3 = st.tabs(["Summary", "Diet Plan", "Meal Plan"],
+                                   key=f"history_tab_{report_id}", on_change="rerun")
         
-        # Header text
-        self.set_font("Times", "B", 10)
-        self.set_text_color(255, 255, 255)
-        self.set_xy(15, 12)
-        self.cell(0, 8, "AI Diet Recommendation Report", align="L")
+        if tab1.open:
+            with tab1:
+                st.markdown("**Simple Explanation:**")
+                st.write(report.get("simple_explanation", "N/A"))
         
-        # Date on right
-        self.set_xy(150, 12)
-        self.cell(0, 8, datetime.now().strftime('%B %d, %Y'), align="L")
+        if tab2.open:
+            with tab2:
+                st.markdown("**Diet Recommendations:**")
+                st.write(report.get("diet_recommendations", "N/A"))
         
-        self.set_text_color(0, 0, 0)
-        self.ln(20)
-    
-    def footer(self):
-        # Position at 15mm from bottom
-        self.set_y(-20)
+        if tab3.open:
+            with tab3:
+                st.markdown("**7-Day Meal Plan:**")
+                st.write(report.get("meal_plan", "N/A"))
         
-        # Green footer bar
-        self.set_fill_color(46, 125, 50)
-        self.rect(10, self.get_y() + 5, 190, 10, 'F')
+        # Actions
+        col1, col2, col3 = st.columns([2, 1, 1])
         
-        # Page number
-        self.set_font("Times", "I", 9)
-        self.set_text_color(255, 255, 255)
-        self.set_y(-14)
-        self.cell(0, 10, f"Page {self.page_no()}", align="C")
-        
-        self.set_text_color(0, 0, 0)
-    
-    def section_title(self, title):
-        """Add a styled section title."""
-        self.set_font("Times", "B", 14)
-        self.set_fill_color(232, 245, 233)  # Light green
-        self.set_text_color(46, 125, 50)
-        self.cell(0, 10, title, ln=True, fill=True)
-        self.set_text_color(0, 0, 0)
-        self.ln(3)
-    
-    def body_text(self, text):
-        """Add body text."""
-        self.set_font("Times", "", 10)
-        self.multi_cell(0, 5, text)
-        self.ln(5)
-
-
-def generate_pdf(results, profile=None):
-    """Generate styled PDF with borders and page numbers on ALL pages."""
-    pdf = StyledPDF(profile)
-    pdf.set_auto_page_break(auto=True, margin=25)
-    pdf.set_margins(15, 25, 15)
-    
-    # Page 1: Title & Medical Summary
-    pdf.add_page()
-    
-    # Title
-    pdf.set_font("Times", "B", 20)
-    pdf.set_text_color(46, 125, 50)
-    pdf.cell(0, 15, "Your Personalized Diet Plan", ln=True, align="C")
-    pdf.set_text_color(0, 0, 0)
-    
-    # User info
-    if profile:
-        pdf.set_font("Times", "I", 12)
-        pdf.cell(0, 8, f"Prepared for: {profile.get('name', 'User')}", ln=True, align="C")
-        pdf.set_font("Times", "", 10)
-        pdf.cell(0, 6, f"Diet Type: {profile.get('diet_type', 'N/A')} | Goal: {profile.get('weight_goal', 'N/A')}", ln=True, align="C")
+        with col1:
+            # PDF is only built once the user asks for it, then served from cache
+            pdf_ready_key = f"pdf_ready_{report_id}"
+            if st.session_state.get(pdf_ready_key):
+                report_results = {
+                    "translation": report.get("simple_explanation", ""),
+                    "diet": report.get("diet_recommendations", ""),
+                    "diet_data": report.get("diet_data"),
+                    "meal_plan": report.get("meal_plan", "")
+                }
+                try:
+                    pdf_data = cached_pdf(report_content_hash(report_results, profile), report_results, profile)
+                    
+                    st.download_button(
+                        "Download PDF",
+                        pdf_data,
+                        f"diet_plan_{date}.pdf",
+                        "application/pdf",
+                        key=f"pdf_{report_id}"
+                    )
+                except Exception as e:
+                    st.error(f"PDF error: {e}")
+            else:
+                # Set before the (fragment) rerun the click triggers
+                st.button("Prepare PDF", key=f"prep_pdf_{report_id}",
+                          on_click=st.session_state.update, kwargs={pdf_ready_key: True})
         
-        allergies = profile.get('allergies', [])
-        if allergies:
-            pdf.cell(0, 6, f"Allergies: {', '.join(allergies)}", ln=True, align="C")
-    
-    pdf.ln(10)
-    
-    # Medical Summary
-    pdf.section_title("Medical Summary")
-    pdf.body_text(clean_text(results["translation"]))
-    
-    # Page 2: Diet Recommendations
-    pdf.add_page()
-    pdf.section_title("Diet Recommendations")
-    pdf.body_text(clean_text(results["diet"]))
-    
-    # Page 3: Meal Plan
-    pdf.add_page()
-    pdf.section_title("7-Day Meal Plan")
-    pdf.body_text(clean_text(results["meal_plan"]))
-    
-    # Final page: Disclaimer
-    pdf.ln(10)
-    pdf.set_font("Times", "I", 9)
-    pdf.set_text_color(128, 128, 128)
-    pdf.multi_cell(0, 5, "Disclaimer: This report is generated by AI and is not medical advice. Always consult a healthcare professional before making dietary changes.")
-    pdf.ln(5)
-    pdf.cell(0, 5, "Generated by AI Diet Recommendation System | Developed by Navya", align="C")
-    
-    # Output
-    temp_path = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf").name
-    pdf.output(temp_path)
-    with open(temp_path, "rb") as f:
-        pdf_bytes = f.read()
-    os.remove(temp_path)
-    
-    return pdf_bytes
+        with col3:
+            if st.button("Delete", key=f"del_{report_id}", type="secondary"):
+                delete_report(report_id)
+                st.rerun()  # whole page: stats and chart change too
+
+@st.cache_resource(show_spinner=False)
+def get_file_reader():
+    """One FileReader per server process (not one per rerun)."""
+    from file_reader import FileReader
+    return FileReader()
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def cached_thumbnails(content_hash, _pdf_bytes):
+    """Small JPEG previews of the first PDF pages, cached like cached_pdf."""
+    return render_thumbnails(_pdf_bytes)
 
 # ============== PROFESSIONAL CSS ==============
 st.markdown("""
@@ -770,7 +765,6 @@ if st.session_state.current_page == "Dashboard":
     
     # Load stats
     stats = get_stats()
-    reports = load_reports()
     
     # Summary Cards with Streamlit Metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -820,11 +814,8 @@ if st.session_state.current_page == "Dashboard":
     if condition_counts:
         st.markdown(f'<p class="section-header">{icon("hospital", 20, "#2E7D32")} Health Conditions Detected</p>', unsafe_allow_html=True)
         
-        # Create a simple bar chart
-        conditions_df = pd.DataFrame([
-            {"Condition": k, "Count": v} 
-            for k, v in condition_counts.items()
-        ])
+        # Create a simple bar chart (rebuilt only after a save/delete)
+        conditions_df = condition_chart_data(stats)
         
         if not conditions_df.empty:
             st.bar_chart(conditions_df.set_index("Condition"))
@@ -832,7 +823,7 @@ if st.session_state.current_page == "Dashboard":
     # Recent Reports
     st.markdown(f'<p class="section-header">{icon("file", 20, "#2E7D32")} Your Report History</p>', unsafe_allow_html=True)
     
-    if not reports:
+    if stats["total_reports"] == 0:
         # Beautiful empty state
         st.markdown(f'''
             <div style="text-align: center; padding: 3rem 2rem; background: linear-gradient(135deg, #F5F5F5, #EEEEEE); border-radius: 20px; margin: 1rem 0;">
@@ -848,57 +839,32 @@ if st.session_state.current_page == "Dashboard":
                 st.session_state.current_page = "Upload"
                 st.rerun()
     else:
-        for i, report in enumerate(reports[:10]):  # Show last 10
-            date = report.get("date", "Unknown")
-            time_str = report.get("time", "")
-            conditions = report.get("conditions_found", ["General"])
-            report_id = report.get("report_id", 0)
-            
-            with st.expander(f"{date} {time_str} — {', '.join(conditions[:3])}", expanded=(i == 0)):
-                
-                tab1, tab2, tab3 = st.tabs(["Summary", "Diet Plan", "Meal Plan"])
-                
-                with tab1:
-                    st.markdown("**Simple Explanation:**")
-                    st.write(report.get("simple_explanation", "N/A"))
-                
-                with tab2:
-                    st.markdown("**Diet Recommendations:**")
-                    st.write(report.get("diet_recommendations", "N/A"))
-                
-                with tab3:
-                    st.markdown("**7-Day Meal Plan:**")
-                    st.write(report.get("meal_plan", "N/A"))
-                
-                # Actions
-                col1, col2, col3 = st.columns([2, 1, 1])
-                
-                with col1:
-                    # Regenerate PDF
-                    try:
-                        pdf_data = generate_pdf({
-                            "translation": report.get("simple_explanation", ""),
-                            "diet": report.get("diet_recommendations", ""),
-                            "meal_plan": report.get("meal_plan", "")
-                        }, profile)
-                        
-                        st.download_button(
-                            "Download PDF",
-                            pdf_data,
-                            f"diet_plan_{date}.pdf",
-                            "application/pdf",
-                            key=f"pdf_{report_id}"
-                        )
-                    except:
-                        pass
-                
-                with col3:
-                    if st.button("Delete", key=f"del_{report_id}", type="secondary"):
-                        delete_report(report_id)
-                        st.rerun()
+        # Cursor pager: history_cursors holds the before_id of every page up to the current one
+        cursors = st.session_state.setdefault("history_cursors", [None])
+        summaries, next_cursor = list_reports(REPORTS_PER_PAGE, cursors[-1])
+        if not summaries and len(cursors) > 1:
+            # Everything on this page was deleted - go back one page
+            cursors.pop()
+            st.rerun()
+        
+        for i, summary in enumerate(summaries):
+            render_history_item(summary, profile, expanded=(i == 0 and len(cursors) == 1))
+        
+        if len(cursors) > 1 or next_cursor is not None:
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.button("Newer", key="history_newer", disabled=len(cursors) == 1, use_container_width=True):
+                    cursors.pop()
+                    st.rerun()
+            with col2:
+                st.markdown(f'<p style="text-align: center; color: #666;">Page {len(cursors)}</p>', unsafe_allow_html=True)
+            with col3:
+                if st.button("Older", key="history_older", disabled=next_cursor is None, use_container_width=True):
+                    cursors.append(next_cursor)
+                    st.rerun()
     
     # Quick Stats
-    if reports:
+    if stats["total_reports"] > 0:
         st.markdown(f'<p class="section-header">{icon("chart", 20, "#2E7D32")} Quick Stats</p>', unsafe_allow_html=True)
         
         col1, col2 = st.columns(2)
@@ -920,6 +886,67 @@ if st.session_state.current_page == "Dashboard":
                     <p style="font-size: 1.5rem; font-weight: 600; color: #2E7D32;">{most_common}</p>
                 </div>
             ''', unsafe_allow_html=True)
+    
+    # Export / Import (whole history, one report at a time)
+    with st.expander("Export / Import History"):
+        import_result = st.session_state.pop("import_result", None)
+        if import_result:
+            st.success(f"Imported {import_result['imported']} report(s), skipped {import_result['skipped']} "
+                       f"already in your history, {import_result['failed']} unreadable.")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            export_format = st.radio("Format", ["JSONL", "ZIP"], horizontal=True, key="export_format")
+            include_pdfs = st.checkbox("Include PDFs", key="export_pdfs", disabled=export_format != "ZIP")
+            st.caption("The download is held in memory - for very large histories use "
+                       "`python -m report_archive export`.")
+            if st.button("Prepare Export", key="export_history", disabled=stats["total_reports"] == 0):
+                with st.spinner("Exporting reports..."):
+                    export_file = export_history(export_format, include_pdfs, profile)
+                st.download_button(
+                    f"Download {export_format}",
+                    export_file,
+                    f"report_history.{export_format.lower()}",
+                    "application/zip" if export_format == "ZIP" else "application/jsonl",
+                    key="export_download"
+                )
+        
+        with col2:
+            import_file = st.file_uploader("Import a JSONL or ZIP export", type=["jsonl", "zip"], key="import_file")
+            if import_file is not None and st.button("Import", key="import_history", type="primary"):
+                from report_archive import import_reports
+                with st.spinner("Importing reports..."):
+                    st.session_state.import_result = import_reports(import_file)
+                st.rerun()
+    
+    # AI Performance (latency + token usage of every agent call in this server process)
+    from metrics import registry as llm_metrics
+    agent_rows = llm_metrics.summary()
+    if agent_rows:
+        st.markdown(f'<p class="section-header">{icon("bot", 20, "#2E7D32")} AI Performance</p>', unsafe_allow_html=True)
+        
+        def _secs(value):
+            return f"{value:.2f}s" if value is not None else "-"
+        
+        st.dataframe(pd.DataFrame([{
+            "Agent": r["agent"],
+            "Model": r["model"],
+            "Calls": r["calls"],
+            "Cache Hits": r["cache_hits"],
+            "Errors": r["errors"],
+            "Latency p50": _secs(r["p50_s"]),
+            "Latency p95": _secs(r["p95_s"]),
+            "First Token p50": _secs(r["ttft_p50_s"]),
+            "Avg Queue": _secs(r["queue_avg_s"]),
+            "Prompt Tokens": r["prompt_tokens"],
+            "Completion Tokens": r["completion_tokens"]
+        } for r in agent_rows]), hide_index=True, use_container_width=True)
+        
+        with st.expander("Prometheus metrics"):
+            prometheus_text = llm_metrics.to_prometheus()
+            st.code(prometheus_text, language="text")
+            st.download_button("Download metrics", prometheus_text, "metrics.prom", "text/plain", key="metrics_download")
 
 # ---------- PROFILE PAGE ----------
 elif st.session_state.current_page == "Profile":
@@ -1138,19 +1165,16 @@ elif st.session_state.current_page == "Upload":
     tab1, tab2 = st.tabs(["Upload File", "Type Text"])
     
     with tab1:
-        st.info("Supported: PDF, Word, Text")
-        uploaded = st.file_uploader("Choose file", type=["pdf", "docx", "txt"])
+        st.info("Supported: PDF, Word, Text, Images (photo or scan)")
+        uploaded = st.file_uploader("Choose file", type=["pdf", "docx", "txt", "png", "jpg", "jpeg"])
         
         if uploaded:
             try:
-                from file_reader import FileReader
-                reader = FileReader()
-                ext = uploaded.name.split(".")[-1]
-                temp_file = f"temp_upload.{ext}"
-                with open(temp_file, "wb") as f:
-                    f.write(uploaded.getbuffer())
-                text = reader.read_file(temp_file)
-                if text and not text.startswith("Error"):
+                # Read straight from the upload buffer - no temp file
+                text = get_file_reader().read_file(uploaded.getvalue(), name=uploaded.name)
+                if text.startswith("❌"):
+                    st.error(text)
+                else:
                     st.session_state.medical_text = text
                     st.success(f"✓ Loaded: {uploaded.name}")
                     with st.expander("Preview"):
@@ -1174,7 +1198,7 @@ elif st.session_state.current_page == "Upload":
                 <div style="background: linear-gradient(135deg, #E8F5E9, #C8E6C9); padding: 2rem; border-radius: 16px; text-align: center;">
                     <div style="margin-bottom: 1rem;">{icon("bot", 48, "#2E7D32")}</div>
                     <h3 style="color: #2E7D32; margin: 0;">AI is analyzing your health data...</h3>
-                    <p style="color: #666; margin: 0.5rem 0 0 0;">This takes about 1-2 minutes</p>
+                    <p style="color: #666; margin: 0.5rem 0 0 0;">Results appear below as they are written (about 1-2 minutes in total)</p>
                 </div>
             ''', unsafe_allow_html=True)
             
@@ -1182,29 +1206,39 @@ elif st.session_state.current_page == "Upload":
             status_text = st.empty()
             
             try:
+                # Each step streams its tokens into the page as they arrive
                 # Step 1: Translation
                 status_text.text("Step 1/3: Translating medical terms...")
                 progress_bar.progress(10)
-                from agent1_translator import run_agent1
-                translation = run_agent1(st.session_state.medical_text)
+                from agent1_translator import stream_agent1
+                with st.expander("Simple Explanation", expanded=True):
+                    translation = st.write_stream(stream_agent1(st.session_state.medical_text))
                 progress_bar.progress(35)
                 
-                # Step 2: Diet recommendations
+                # Step 2: Diet recommendations (structured JSON, each field shown once complete)
                 status_text.text("Step 2/3: Creating diet recommendations...")
-                from agent2_recommender import run_agent2
-                diet_rec = run_agent2(translation)
+                from agent2_recommender import stream_agent2_structured, format_diet, DIET_SCHEMA
+                with st.expander("Diet Recommendations", expanded=True):
+                    diet_view = st.empty()
+                    for diet_data in stream_agent2_structured(translation):
+                        diet_view.markdown(format_diet(diet_data))
+                        done = sum(1 for value in diet_data.values() if value)
+                        progress_bar.progress(35 + 30 * done // len(DIET_SCHEMA))
+                diet_rec = format_diet(diet_data)
                 progress_bar.progress(65)
                 
                 # Step 3: Meal plan
                 status_text.text("Step 3/3: Generating 7-day meal plan...")
-                from agent3_meal_planner import run_agent3
-                meal_plan = run_agent3(diet_rec)
+                from agent3_meal_planner import stream_agent3
+                with st.expander("7-Day Meal Plan", expanded=True):
+                    meal_plan = st.write_stream(stream_agent3(diet_rec))
                 progress_bar.progress(90)
                 
                 # Save results
                 st.session_state.results = {
                     "translation": translation,
                     "diet": diet_rec,
+                    "diet_data": diet_data,
                     "meal_plan": meal_plan
                 }
                 
@@ -1213,7 +1247,8 @@ elif st.session_state.current_page == "Upload":
                     medical_text=st.session_state.medical_text,
                     translation=translation,
                     diet_rec=diet_rec,
-                    meal_plan=meal_plan
+                    meal_plan=meal_plan,
+                    diet_data=diet_data
                 )
                 
                 progress_bar.progress(100)
@@ -1240,22 +1275,10 @@ elif st.session_state.current_page == "Upload":
         
         st.markdown(f'<p class="section-header">{icon("salad", 20, "#2E7D32")} Foods to Eat & Avoid</p>', unsafe_allow_html=True)
         
-        # Parse foods
-        eat_items, avoid_items = [], []
-        avoid_section = False
-        for line in st.session_state.results["diet"].split("\n"):
-            line = line.strip()
-            if "avoid" in line.lower() and not line.startswith(("-", "•")):
-                avoid_section = True
-                continue
-            if "include" in line.lower() and not line.startswith(("-", "•")):
-                avoid_section = False
-                continue
-            if line.startswith(("-", "•", "*")):
-                food = re.sub(r'^[-•*]\s*', '', line)
-                food = re.sub(r'\s*[:(].*', '', food).strip()
-                if 3 < len(food) < 50:
-                    (avoid_items if avoid_section else eat_items).append(food)
+        # Foods come straight from the structured Agent 2 output
+        diet_data = st.session_state.results.get("diet_data") or {}
+        eat_items = list(diet_data.get("foods_include", []))
+        avoid_items = list(diet_data.get("foods_avoid", []))
         
         if eat_items or avoid_items:
             max_len = max(len(eat_items), len(avoid_items))
@@ -1274,7 +1297,8 @@ elif st.session_state.current_page == "Upload":
         # PDF Download
         st.markdown(f'<p class="section-header">{icon("download", 20, "#2E7D32")} Download Report</p>', unsafe_allow_html=True)
         try:
-            pdf_bytes = generate_pdf(st.session_state.results, profile)
+            pdf_hash = report_content_hash(st.session_state.results, profile)
+            pdf_bytes = cached_pdf(pdf_hash, st.session_state.results, profile)
             
             st.markdown('''
                 <div style="background: linear-gradient(135deg, #E8F5E9, #C8E6C9); padding: 1.5rem; border-radius: 16px; text-align: center; margin-bottom: 1rem;">
@@ -1294,25 +1318,38 @@ elif st.session_state.current_page == "Upload":
                     type="primary"
                 )
             
-            # PDF Preview using components.html (works on Streamlit Cloud)
+            # PDF Preview: small page thumbnails by default; the full document
+            # is only embedded (base64 iframe) when the user asks for it
             with st.expander("Preview PDF"):
-                b64_pdf = base64.b64encode(pdf_bytes).decode("utf-8")
-                
-                # Create iframe HTML with sandbox attributes
-                pdf_iframe = f'''
-                    <iframe 
-                        src="data:application/pdf;base64,{b64_pdf}" 
-                        width="100%" 
-                        height="600" 
-                        type="application/pdf"
-                        sandbox="allow-same-origin allow-scripts"
-                        style="border: none; border-radius: 8px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
-                        <p>Your browser does not support PDFs. 
-                        <a href="data:application/pdf;base64,{b64_pdf}" download="diet_plan.pdf">Download the PDF</a> instead.</p>
-                    </iframe>
-                '''
+                thumbnails, page_count = cached_thumbnails(pdf_hash, pdf_bytes)
+                if thumbnails:
+                    thumb_cols = st.columns(len(thumbnails))
+                    for i, thumbnail in enumerate(thumbnails):
+                        thumb_cols[i].image(thumbnail, caption=f"Page {i + 1}", use_container_width=True)
+                    if page_count > len(thumbnails):
+                        st.caption(f"Showing {len(thumbnails)} of {page_count} pages")
                 
-                components.html(pdf_iframe, height=620, scrolling=True)
+                if st.session_state.get("show_full_pdf") == pdf_hash:
+                    b64_pdf = base64.b64encode(pdf_bytes).decode("utf-8")
+                    
+                    # Create iframe HTML with sandbox attributes
+                    pdf_iframe = f'''
+                        <iframe 
+                            src="data:application/pdf;base64,{b64_pdf}" 
+                            width="100%" 
+                            height="600" 
+                            type="application/pdf"
+                            sandbox="allow-same-origin allow-scripts"
+                            style="border: none; border-radius: 8px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">
+                            <p>Your browser does not support PDFs. 
+                            <a href="data:application/pdf;base64,{b64_pdf}" download="diet_plan.pdf">Download the PDF</a> instead.</p>
+                        </iframe>
+                    '''
+                    
+                    components.html(pdf_iframe, height=620, scrolling=True)
+                elif st.button("Open Full PDF Viewer", key="open_full_pdf"):
+                    st.session_state.show_full_pdf = pdf_hash
+                    st.rerun()
                 
         except Exception as e:
             st.error(f"PDF error: {e}")
@@ -0,0 +1,155 @@
+"""
+Batch Pipeline - Headless Report Backfill
+=========================================
+Runs translator -> recommender -> meal planner over many medical reports
+without Streamlit.
+
+Usage:
+    python -m batch_pipeline <reports_dir | reports.jsonl> \\
+        --profile user_profile.json --output results.jsonl --workers 4
+
+Input:
+- a directory of report files (pdf, docx, txt, images - anything
+  FileReader supports), or
+- a JSONL file with one {"id": ..., "medical_text": ...} object per line
+
+Output:
+- JSONL, one report per line in the same shape as
+  data/reports/report_<id>.json plus a "source" field naming the input
+- The output file doubles as the checkpoint: items whose source is
+  already in it are skipped, so an interrupted run can simply be restarted
+- Failed items are logged and left out, so the next run retries them
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
+
+from pipeline import run_pipeline
+from report_manager import build_report
+
+
+def iter_inputs(source):
+    """
+    Yield (item_id, loader) pairs from a directory or JSONL file.
+    loader() returns the medical text (files are only read when processed).
+    """
+    if os.path.isdir(source):
+        from file_reader import FileReader
+        reader = FileReader()
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if os.path.isfile(path) and reader.is_supported_format(path):
+                yield name, (lambda path=path: reader.read_file(path))
+        return
+
+    with open(source, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            item_id = str(item.get("id", f"line-{line_no}"))
+            text = item.get("medical_text") or item.get("text") or ""
+            yield item_id, (lambda text=text: text)
+
+
+def load_checkpoint(output_path):
+    """Return the set of sources already present in the output file."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["source"])
+            except (ValueError, KeyError):
+                continue  # partial last line from an interrupted run
+    return done
+
+
+def process_item(item_id, loader, profile):
+    """Run the full pipeline for one input. Returns the report dict."""
+    medical_text = loader()
+    if not medical_text or medical_text.startswith("❌") or len(medical_text.strip()) <= 10:
+        raise ValueError(medical_text or "empty report")
+
+    results = run_pipeline(medical_text, profile)
+    report = build_report(
+        medical_text=medical_text,
+        translation=results["translation"],
+        diet_rec=results["diet"],
+        meal_plan=results["meal_plan"],
+        diet_data=results["diet_data"]
+    )
+    report["source"] = item_id
+    return report
+
+
+def run_batch(source, profile, output_path, workers=4):
+    """
+    Process every input not yet in output_path with at most `workers`
+    reports in flight.
+
+    Returns:
+        dict with done, skipped and failed counts
+    """
+    done = load_checkpoint(output_path)
+    stats = {"done": 0, "skipped": 0, "failed": 0}
+    start = time.time()
+
+    with open(output_path, "a", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def drain(return_when):
+            finished, _ = wait(pending, return_when=return_when)
+            for future in finished:
+                item_id = pending.pop(future)
+                try:
+                    report = future.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"❌ {item_id}: {e}")
+                    continue
+                out.write(json.dumps(report, ensure_ascii=False) + "\n")
+                out.flush()
+                stats["done"] += 1
+                print(f"✅ {item_id} ({stats['done']} done, {time.time() - start:.0f}s)")
+
+        for item_id, loader in iter_inputs(source):
+            if item_id in done:
+                stats["skipped"] += 1
+                continue
+            # Keep the queue bounded so huge inputs don't pile up in memory
+            if len(pending) >= workers * 2:
+                drain(FIRST_COMPLETED)
+            pending[pool.submit(process_item, item_id, loader, profile)] = item_id
+
+        if pending:
+            drain(ALL_COMPLETED)
+
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the diet agent pipeline over many reports.")
+    parser.add_argument("source", help="Directory of report files or a JSONL file")
+    parser.add_argument("--profile", default="user_profile.json", help="Profile JSON (like user_profile.json)")
+    parser.add_argument("--output", default="batch_results.jsonl", help="Output JSONL (also the checkpoint)")
+    parser.add_argument("--workers", type=int, default=4, help="Reports processed concurrently")
+    args = parser.parse_args(argv)
+
+    with open(args.profile, "r", encoding="utf-8") as f:
+        profile = json.load(f)
+
+    stats = run_batch(args.source, profile, args.output, workers=max(1, args.workers))
+    print(f"\n📊 Done: {stats['done']} | Skipped (checkpoint): {stats['skipped']} | Failed: {stats['failed']}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
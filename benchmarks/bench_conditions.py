@@ -0,0 +1,104 @@
+"""
+Condition Extraction Benchmark
+==============================
+Compares the old extract_conditions (keyword dict rebuilt per call,
+substring scan) with the word-bounded, negation-aware matcher in
+report_manager on the saved reports in data/reports/ (repeated to
+--count texts). extract_conditions_batch is timed too; it is the same
+per-text loop, so expect the same rate.
+
+Also lists texts where the two disagree, e.g. "bp" found inside "bpm".
+
+Usage:
+    python benchmarks/bench_conditions.py --count 2000
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from report_manager import extract_conditions, extract_conditions_batch
+
+
+def legacy_extract_conditions(text):
+    """The substring-scan version extract_conditions replaced."""
+    text_lower = text.lower()
+
+    condition_keywords = {
+        "Diabetes": ["diabetes", "blood sugar", "glucose", "hba1c", "hyperglycemia", "insulin"],
+        "High Cholesterol": ["cholesterol", "ldl", "hdl", "triglycerides", "lipid"],
+        "Hypertension": ["hypertension", "blood pressure", "bp", "high pressure"],
+        "Anemia": ["anemia", "iron", "hemoglobin", "ferritin", "low iron"],
+        "Thyroid": ["thyroid", "tsh", "t3", "t4", "hypothyroid", "hyperthyroid"],
+        "Kidney": ["kidney", "creatinine", "urea", "renal", "gfr"],
+        "Liver": ["liver", "alt", "ast", "bilirubin", "hepatic"],
+        "Vitamin D Deficiency": ["vitamin d", "vit d", "25-oh"],
+        "Vitamin B12 Deficiency": ["vitamin b12", "b12", "cobalamin"],
+        "Obesity": ["obesity", "bmi", "overweight", "weight loss"],
+        "Heart Disease": ["heart", "cardiac", "cardiovascular", "coronary"],
+        "PCOS": ["pcos", "polycystic", "ovarian"],
+        "Uric Acid": ["uric acid", "gout", "urate"]
+    }
+
+    detected = []
+    for condition, keywords in condition_keywords.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                if condition not in detected:
+                    detected.append(condition)
+                break
+    return detected if detected else ["General Health"]
+
+
+def load_texts(count):
+    """Translation + diet text of each saved report, repeated to `count`."""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "data", "reports", "report_*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        texts.append(report["simple_explanation"] + " " + report["diet_recommendations"])
+    return [texts[i % len(texts)] for i in range(count)]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extract_conditions implementations.")
+    parser.add_argument("--count", type=int, default=2000, help="Number of texts to classify")
+    args = parser.parse_args()
+
+    texts = load_texts(args.count)
+    chars = sum(len(t) for t in texts)
+    print(f"📄 {len(texts)} texts, {chars / 1024 / 1024:.1f} MB\n")
+
+    legacy, legacy_s = timed(lambda: [legacy_extract_conditions(t) for t in texts])
+    single, single_s = timed(lambda: [extract_conditions(t) for t in texts])
+    batch, batch_s = timed(lambda: extract_conditions_batch(texts))
+
+    print(f"{'implementation':<26}{'seconds':>10}{'texts/s':>12}")
+    for name, seconds in (("legacy substring", legacy_s), ("word-bounded, per text", single_s), ("word-bounded, batch", batch_s)):
+        print(f"{name:<26}{seconds:>10.3f}{len(texts) / seconds:>12.0f}")
+
+    assert single == batch, "batch and per-text results differ"
+
+    unique = {}
+    for text, old, new in zip(texts, legacy, single):
+        if old != new:
+            unique.setdefault(text, (old, new))
+    print(f"\n🔍 {len(unique)} distinct text(s) classified differently")
+    for text, (old, new) in list(unique.items())[:5]:
+        print(f"   - legacy only: {sorted(set(old) - set(new))} | new only: {sorted(set(new) - set(old))}")
+
+
+if __name__ == "__main__":
+    main()
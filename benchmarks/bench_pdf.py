@@ -0,0 +1,95 @@
+"""
+PDF Rendering Benchmark
+=======================
+Compares the old tempfile round-trip with in-memory rendering, serially
+and across a process pool, on large 7-day plans built from the saved
+reports in data/reports/.
+
+Reports PDFs/sec and peak RSS (this process and pool workers).
+
+Usage:
+    python benchmarks/bench_pdf.py --count 40 --scale 4 --workers 4
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import resource
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "agents"))
+
+from pdf_renderer import StyledPDF, clean_text, generate_pdf, render_many
+
+
+def load_samples(scale):
+    """Saved reports with the meal plan repeated `scale` times (long plans)."""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "data", "reports", "report_*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        samples.append({
+            "translation": report["simple_explanation"],
+            "diet": report["diet_recommendations"],
+            "meal_plan": "\n\n".join([report["meal_plan"]] * scale)
+        })
+    return samples
+
+
+def legacy_pdf(results, profile):
+    """The previous implementation: write to a temp file, read it back, delete it."""
+    pdf = StyledPDF(profile)
+    pdf.set_auto_page_break(auto=True, margin=25)
+    pdf.set_margins(15, 25, 15)
+    for title, key in (("Medical Summary", "translation"), ("Diet Recommendations", "diet"), ("7-Day Meal Plan", "meal_plan")):
+        pdf.add_page()
+        pdf.section_title(title)
+        pdf.body_text(clean_text(results[key]))
+    temp_path = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf").name
+    pdf.output(temp_path)
+    with open(temp_path, "rb") as f:
+        pdf_bytes = f.read()
+    os.remove(temp_path)
+    return pdf_bytes
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    return resource.getrusage(who).ru_maxrss / 1024  # KB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF rendering.")
+    parser.add_argument("--count", type=int, default=40, help="PDFs per variant")
+    parser.add_argument("--scale", type=int, default=4, help="Meal plan repetitions (plan length)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, "user_profile.json"), "r", encoding="utf-8") as f:
+        profile = json.load(f)
+    samples = load_samples(args.scale)
+    batch = [samples[i % len(samples)] for i in range(args.count)]
+
+    print(f"📄 {args.count} PDFs, meal plans ~{len(batch[0]['meal_plan']) // 1000} KB of text, {args.workers} workers\n")
+    print(f"{'variant':<22}{'PDFs/s':>9}{'avg KB':>9}{'peak RSS MB':>13}")
+
+    variants = [
+        ("tempfile (old)", lambda: [legacy_pdf(r, profile) for r in batch]),
+        ("in-memory serial", lambda: [generate_pdf(r, profile) for r in batch]),
+        ("in-memory pool", lambda: list(render_many(batch, profile, workers=args.workers))),
+    ]
+    for name, run in variants:
+        start = time.perf_counter()
+        pdfs = run()
+        elapsed = time.perf_counter() - start
+        avg_kb = sum(len(p) for p in pdfs) / len(pdfs) / 1024
+        rss = max(peak_rss_mb(), peak_rss_mb(resource.RUSAGE_CHILDREN))
+        print(f"{name:<22}{len(pdfs) / elapsed:>9.1f}{avg_kb:>9.1f}{rss:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
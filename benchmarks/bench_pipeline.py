@@ -0,0 +1,169 @@
+"""
+Pipeline Latency Benchmark
+==========================
+Drives run_agent1, run_agent2_structured (the Agent 2 mode the app
+uses), run_agent3, run_agent4 and the full pipeline (what
+app.process_report runs) against the offline mock Groq server and
+reports per stage:
+
+- p50 / p95 / p99 latency
+- throughput (calls/sec at the chosen concurrency)
+- CPU seconds per call and peak Python memory (tracemalloc)
+
+Usage:
+    python benchmarks/bench_pipeline.py --iterations 20 --concurrency 4
+    python benchmarks/bench_pipeline.py --latency-ms 800 --error-rate 0.1
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "agents"))
+
+from mock_groq_server import MockConfig, start_server
+
+
+SAMPLE_REPORT = (
+    "Fasting glucose {n} mg/dL (70-99), HbA1c 8.2% (<5.7), LDL cholesterol 162 mg/dL, "
+    "Hemoglobin 11.2 g/dL (low), Vitamin D 14 ng/mL (deficient), TSH 2.1 mIU/L."
+)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_stage(name, func, iterations, concurrency):
+    """Call func(i) `iterations` times with `concurrency` threads and measure it."""
+    latencies = []
+    errors = 0
+
+    def timed(i):
+        start = time.perf_counter()
+        func(i)
+        return time.perf_counter() - start
+
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(timed, i) for i in range(iterations)]:
+            try:
+                latencies.append(future.result())
+            except Exception as e:
+                errors += 1
+                print(f"   ❌ {name}: {e}")
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if not latencies:
+        return {"stage": name, "calls": 0, "errors": errors}
+    return {
+        "stage": name,
+        "calls": len(latencies),
+        "errors": errors,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "throughput_per_s": len(latencies) / wall,
+        "cpu_s_per_call": cpu / iterations,
+        "peak_mem_mb": peak / 1024 / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipeline against a mock Groq server.")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=400.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.3)
+    parser.add_argument("--tokens-per-sec", type=float, default=1000.0)
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--keep-rate-limits", action="store_true",
+                        help="Keep the real Groq RPM/TPM budgets (default: effectively unlimited)")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec, completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate, retry_after=0.2, seed=42
+    )
+    server, base_url = start_server(0, config)
+
+    # llm.py reads these at import time
+    os.environ["GROQ_BASE_URL"] = base_url
+    os.environ["GROQ_API_KEY"] = "mock"
+    os.environ["LLM_CACHE_DISABLED"] = "1"
+    # The sample report is fully covered by translator_rules - measure the LLM path instead
+    os.environ["AGENT1_RULES_DISABLED"] = "1"
+    if not args.keep_rate_limits:
+        for name in ("FAST", "SMART"):
+            os.environ[f"LLM_RPM_{name}"] = "1000000"
+            os.environ[f"LLM_TPM_{name}"] = "1000000000"
+
+    from agent1_translator import run_agent1
+    from agent2_recommender import run_agent2_structured
+    from agent3_meal_planner import run_agent3
+    from agent4_qa import run_agent4
+    from pipeline import run_pipeline
+
+    with open(os.path.join(ROOT, "user_profile.json"), "r", encoding="utf-8") as f:
+        profile = json.load(f)
+
+    # Each call gets a distinct input so nothing is served from a cache
+    stages = [
+        ("agent1", lambda i: run_agent1(SAMPLE_REPORT.format(n=150 + i), profile)),
+        ("agent2", lambda i: run_agent2_structured(f"Explanation #{i}: blood sugar is high.", profile)),
+        ("agent3", lambda i: run_agent3(f"Diet #{i}: DASH diet, more fiber.", profile)),
+        ("agent4", lambda i: run_agent4(f"Can I eat rice? ({i})", None, profile)),
+        ("process_report", lambda i: run_pipeline(SAMPLE_REPORT.format(n=300 + i), profile)),
+    ]
+
+    # Silence the agents' progress prints while measuring
+    results = []
+    for name, func in stages:
+        real_stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        try:
+            results.append(run_stage(name, func, args.iterations, args.concurrency))
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        print(f"✅ {name} done")
+
+    server.shutdown()
+
+    print()
+    print(f"{'stage':<16}{'calls':>6}{'err':>5}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'calls/s':>9}{'cpu ms':>9}{'mem MB':>9}")
+    for r in results:
+        if not r["calls"]:
+            print(f"{r['stage']:<16}{0:>6}{r['errors']:>5}")
+            continue
+        print(f"{r['stage']:<16}{r['calls']:>6}{r['errors']:>5}{r['p50_s']:>9.3f}{r['p95_s']:>9.3f}{r['p99_s']:>9.3f}"
+              f"{r['throughput_per_s']:>9.2f}{r['cpu_s_per_call'] * 1000:>9.1f}{r['peak_mem_mb']:>9.2f}")
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\nMock server: {config.requests} requests, {config.errors} injected errors | peak RSS {max_rss_mb:.0f} MB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Report Storage Benchmark
+========================
+Bytes per report and load latency of the compressed, deduplicated report
+storage (report_codec.py) against plain JSON, on reports built from the
+saved ones in data/reports/.
+
+1. Compression, per report (texts only, no dedup):
+   plain JSON, zlib, zlib + dictionary, zstd + dictionary (if installed).
+   The dictionary is trained leave-one-out: never on the report it
+   compresses, so the numbers hold for new reports.
+2. SQLiteReportStore with --count reports whose texts repeat (as with
+   cached agent answers): database bytes per report, load_reports() and
+   get_report() latency, plain JSON bodies vs packed.
+
+Usage:
+    python benchmarks/bench_report_store.py --count 500 --unique 0.5
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import zlib
+import random
+import sqlite3
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import report_codec
+from report_codec import TEXT_FIELDS, train_dictionary
+from report_manager import SQLiteReportStore
+
+
+def load_samples():
+    samples = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "data", "reports", "report_*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            samples.append(json.load(f))
+    return samples
+
+
+def zlib_size(raw, zdict=None):
+    compressor = zlib.compressobj(9, zdict=zdict) if zdict else zlib.compressobj(9)
+    return len(compressor.compress(raw) + compressor.flush())
+
+
+def zstd_size(raw, zdict):
+    zstandard = report_codec.zstandard
+    dict_data = zstandard.ZstdCompressionDict(zdict, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+    return len(zstandard.ZstdCompressor(level=19, dict_data=dict_data).compress(raw))
+
+
+def compression_table(samples):
+    """Average compressed bytes of a report's texts, dictionary trained on the other reports."""
+    totals = {"plain JSON": 0, "zlib": 0, "zlib + dictionary": 0}
+    if report_codec.ZSTD_AVAILABLE:
+        totals["zstd + dictionary"] = 0
+
+    for i, report in enumerate(samples):
+        others = [r[f] for j, r in enumerate(samples) if j != i for f in TEXT_FIELDS if isinstance(r.get(f), str)]
+        zdict = train_dictionary(others)
+        for field in TEXT_FIELDS:
+            raw = (report.get(field) or "").encode("utf-8")
+            totals["plain JSON"] += len(json.dumps(report.get(field) or ""))
+            totals["zlib"] += zlib_size(raw)
+            totals["zlib + dictionary"] += zlib_size(raw, zdict)
+            if report_codec.ZSTD_AVAILABLE:
+                totals["zstd + dictionary"] += zstd_size(raw, zdict)
+
+    print(f"{'texts of one report':<22}{'bytes':>10}{'ratio':>8}")
+    for name, total in totals.items():
+        print(f"{name:<22}{total / len(samples):>10.0f}{totals['plain JSON'] / total:>8.1f}x")
+
+
+def build_reports(samples, count, unique):
+    """count reports; a `unique` share get texts of their own, the rest reuse sample texts."""
+    rng = random.Random(42)
+    reports = []
+    for i in range(count):
+        report = dict(rng.choice(samples))
+        report["report_id"] = i + 1
+        if rng.random() < unique:
+            for field in TEXT_FIELDS:
+                report[field] = f"{report[field]}\n\n(Follow-up note {i})"
+        reports.append(report)
+    return reports
+
+
+def timed(func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def file_size(path):
+    return sum(os.path.getsize(p) for p in glob.glob(path + "*"))
+
+
+def store_table(reports):
+    """Database size and load latency: plain JSON bodies vs packed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_path = os.path.join(tmp, "plain.sqlite")
+        conn = sqlite3.connect(plain_path)
+        conn.execute("CREATE TABLE reports (report_id INTEGER PRIMARY KEY, body TEXT NOT NULL)")
+        conn.executemany("INSERT INTO reports VALUES (?, ?)", [(r["report_id"], json.dumps(r)) for r in reports])
+        conn.commit()
+        conn.execute("VACUUM")
+
+        packed_path = os.path.join(tmp, "packed.sqlite")
+        store = SQLiteReportStore(packed_path)
+        for report in reports:
+            store.add(dict(report))
+        store._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        store._conn.execute("VACUUM")
+
+        ids = [r["report_id"] for r in reports]
+        plain_list = timed(lambda: [json.loads(b) for (b,) in conn.execute("SELECT body FROM reports ORDER BY report_id DESC")], 3)
+        packed_list = timed(store.list, 3)
+        plain_get = timed(lambda: [json.loads(conn.execute("SELECT body FROM reports WHERE report_id = ?", (i,)).fetchone()[0]) for i in ids])
+        packed_get = timed(lambda: [store.get(i) for i in ids])
+        blobs = store._conn.execute("SELECT COUNT(*) FROM report_blobs").fetchone()[0]
+
+        print(f"\n{len(reports)} reports, {blobs} distinct texts")
+        print(f"{'storage':<10}{'bytes/report':>14}{'load all (ms)':>16}{'get one (ms)':>15}")
+        print(f"{'plain':<10}{file_size(plain_path) / len(reports):>14.0f}{plain_list * 1000:>16.1f}{plain_get / len(ids) * 1000:>15.3f}")
+        print(f"{'packed':<10}{file_size(packed_path) / len(reports):>14.0f}{packed_list * 1000:>16.1f}{packed_get / len(ids) * 1000:>15.3f}")
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compressed report storage.")
+    parser.add_argument("--count", type=int, default=500, help="Reports in the store benchmark")
+    parser.add_argument("--unique", type=float, default=0.5, help="Share of reports with texts of their own")
+    args = parser.parse_args()
+
+    samples = load_samples()
+    codec = "zstd" if report_codec.ZSTD_AVAILABLE else "zlib"
+    print(f"📄 {len(samples)} sample reports, store codec: {codec}, dictionary v{report_codec.current_version()}\n")
+    compression_table(samples)
+    store_table(build_reports(samples, args.count, args.unique))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Mock Groq Server - Offline OpenAI-Compatible Stand-In
+=====================================================
+Answers POST /v1/chat/completions (and /openai/v1/...) like Groq does,
+including SSE streaming, so the agents can run without a key or network.
+
+Point llm.py at it with:
+    GROQ_BASE_URL=http://127.0.0.1:8765/openai/v1 GROQ_API_KEY=mock
+
+Knobs:
+- latency: log-normal time to first token (median + sigma)
+- tokens/sec: generation speed after the first token
+- completion tokens: how long answers are (capped by max_tokens)
+- error injection: fraction of calls answered with 429 / 500
+- JSON mode: with response_format json_object, the first JSON object in
+  the prompt is used as a template and filled with fake values
+
+Usage:
+    python benchmarks/mock_groq_server.py --port 8765 --latency-ms 400 --tokens-per-sec 250
+"""
+
+import json
+import time
+import math
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+WORDS = (
+    "eat more leafy greens whole grains and lentils drink water daily "
+    "limit sugar salt and fried foods choose fresh fruit beans oats "
+    "walk after meals sleep well and check your levels with your doctor"
+).split()
+
+
+class MockConfig:
+    """Behaviour of the mock server (shared by all handler threads)."""
+
+    def __init__(self, latency_ms=400.0, latency_sigma=0.3, tokens_per_sec=250.0,
+                 completion_tokens=300, error_rate=0.0, error_status=429, retry_after=1.0,
+                 seed=None):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+
+    def first_token_delay(self):
+        """Seconds before the first token (log-normal around latency_ms)."""
+        with self.lock:
+            return self.random.lognormvariate(math.log(self.latency_ms / 1000), self.latency_sigma)
+
+
+    def should_fail(self):
+        with self.lock:
+            self.requests += 1
+            failed = self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+
+def _fake_tokens(count, seed):
+    rnd = random.Random(seed)
+    return [rnd.choice(WORDS) + " " for _ in range(count)]
+
+
+def _json_template(messages):
+    """First JSON object found in the prompt (the shape the agent asked for)."""
+    decoder = json.JSONDecoder()
+    text = (messages[-1].get("content") or "") if messages else ""
+    for i, ch in enumerate(text):
+        if ch == "{":
+            try:
+                value, _ = decoder.raw_decode(text, i)
+            except ValueError:
+                continue
+            if isinstance(value, dict):
+                return value
+    return {"result": ""}
+
+
+def _fill_template(template, seed):
+    """Replace template values with fake text of the same type."""
+    rnd = random.Random(seed)
+    filled = {}
+    for key, value in template.items():
+        if isinstance(value, list):
+            filled[key] = [" ".join(rnd.choice(WORDS) for _ in range(2)) for _ in range(12)]
+        else:
+            filled[key] = " ".join(rnd.choice(WORDS) for _ in range(12))
+    return filled
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    """HTTP handler; the server's `config` attribute holds a MockConfig."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+
+    def log_message(self, format, *args):
+        pass  # quiet - benchmarks print their own output
+
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        config = self.server.config
+
+        if config.should_fail():
+            headers = {"Retry-After": str(config.retry_after)} if config.error_status == 429 else {}
+            self._send_json(config.error_status, {"error": {"message": "injected error", "type": "mock"}}, headers)
+            return
+
+        prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+        prompt_tokens = prompt_chars // 4
+        completion_tokens = min(config.completion_tokens, body.get("max_tokens") or config.completion_tokens)
+        tokens = _fake_tokens(completion_tokens, prompt_chars)
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            content = json.dumps(_fill_template(_json_template(body.get("messages", [])), prompt_chars))
+            tokens = [content[i:i + 4] for i in range(0, len(content), 4)]
+            completion_tokens = len(tokens)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        base = {
+            "id": f"chatcmpl-mock-{time.time_ns()}",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+        }
+
+        time.sleep(config.first_token_delay())
+
+        if body.get("stream"):
+            self._stream(base, tokens, usage, config, body.get("stream_options") or {})
+            return
+
+        time.sleep(completion_tokens / config.tokens_per_sec)
+        self._send_json(200, dict(base, object="chat.completion", usage=usage, choices=[{
+            "index": 0,
+            "message": {"role": "assistant", "content": "".join(tokens)},
+            "finish_reason": "stop"
+        }]))
+
+
+    def _stream(self, base, tokens, usage, config, stream_options):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(payload):
+            data = payload if isinstance(payload, str) else json.dumps(dict(base, object="chat.completion.chunk", **payload))
+            self.wfile.write(f"data: {data}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        # Send tokens in small groups paced to tokens_per_sec
+        group = 4
+        for i in range(0, len(tokens), group):
+            if i:
+                time.sleep(group / config.tokens_per_sec)
+            send({"choices": [{"index": 0, "delta": {"content": "".join(tokens[i:i + group])}, "finish_reason": None}]})
+
+        send({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}})
+        if stream_options.get("include_usage"):
+            send({"choices": [], "usage": usage})
+        send("[DONE]")
+
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_server(port=0, config=None):
+    """
+    Start the mock server in a background thread.
+
+    Returns:
+        (server, base_url) - call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockGroqHandler)
+    server.daemon_threads = True
+    server.config = config or MockConfig()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/openai/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OpenAI-compatible mock of the Groq API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="Median time to first token")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Log-normal spread of the latency")
+    parser.add_argument("--tokens-per-sec", type=float, default=250.0)
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls that fail")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms, latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec, completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate, error_status=args.error_status,
+        retry_after=args.retry_after, seed=args.seed
+    )
+    server, base_url = start_server(args.port, config)
+    print(f"🧪 Mock Groq server on {base_url}")
+    print(f"   GROQ_BASE_URL={base_url} GROQ_API_KEY=mock")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Diet Format - Structured Diet Data as Text
+==========================================
+The fields of Agent 2's structured diet (DIET_SCHEMA) and their text
+layout. Kept apart from agents/agent2_recommender.py so the PDF renderer
+and the report archive can format a saved diet without the agents
+package or an LLM client.
+"""
+
+# Structured mode: field -> (type, markdown section title)
+DIET_SCHEMA = {
+    "diet_name": (str, "RECOMMENDED DIET"),
+    "why": (str, "WHY THIS DIET"),
+    "foods_include": (list, "FOODS TO INCLUDE"),
+    "foods_avoid": (list, "FOODS TO AVOID"),
+    "meal_timing": (str, "MEAL TIMING"),
+    "nutrients": (list, "KEY NUTRIENTS"),
+    "hydration": (str, "HYDRATION"),
+    "tips": (list, "LIFESTYLE TIPS"),
+}
+
+
+def format_diet(data, markdown=True):
+    """
+    Render structured diet data in the same section layout as run_agent2,
+    so Agent 3, the PDF and the history views can use it as text.
+    """
+    sections = []
+    for field, (kind, title) in DIET_SCHEMA.items():
+        value = data.get(field)
+        if not value:
+            continue
+        heading = f"## {title}" if markdown else title
+        body = "\n".join(f"- {item}" for item in value) if kind is list else value
+        sections.append(f"{heading}\n{body}")
+    return "\n\n".join(sections)
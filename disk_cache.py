@@ -0,0 +1,158 @@
+"""
+Disk Cache - Persistent Key/Value Store
+======================================
+Small SQLite-backed cache shared by the app's slow paths (LLM calls,
+file extraction, ...).
+
+- Values are text (store JSON if you need structure)
+- Entries expire after `ttl` seconds
+- When the cache grows past `max_bytes` / `max_entries`, the least
+  recently used entries are evicted first
+- Hit/miss/eviction counters for the current process via stats()
+
+Safe to share between Streamlit script threads (one connection + lock).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class DiskCache:
+    """
+    SQLite-backed LRU cache with TTL expiry.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024, max_entries=10000):
+        """
+        Args:
+            path: SQLite file to use (parent directory is created)
+            ttl: Seconds an entry stays valid (None = never expires)
+            max_bytes: Total stored value size before LRU eviction kicks in
+            max_entries: Maximum number of entries before LRU eviction
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+
+    def set(self, key, value):
+        """Store a text value, evicting old entries if over budget."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict(now)
+
+
+    def delete(self, key):
+        """Remove one entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self.hits = self.misses = self.evictions = 0
+
+
+    def stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict with hits, misses, hit_rate, evictions, entries, bytes
+        """
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total
+        }
+
+
+    def _evict(self, now):
+        """Drop expired entries, then least recently used ones until within budget."""
+        if self.ttl is not None:
+            cur = self._conn.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl,))
+            self.evictions += max(cur.rowcount, 0)
+
+        entries, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+        ).fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Walk from oldest access time and drop rows until both budgets fit
+        doomed = []
+        rows = self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at ASC").fetchall()
+        for key, size in rows:
+            if entries <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            entries -= 1
+            total -= size
+
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", doomed)
+        self.evictions += len(doomed)
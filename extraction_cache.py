@@ -0,0 +1,109 @@
+"""
+Extraction Cache - Text Extracted from Uploaded Files
+=====================================================
+Remembers the text FileReader pulled out of a document, keyed by the
+SHA-256 of the file bytes, so the same upload is never parsed twice.
+
+Two tiers:
+- memory: small LRU dict, instant for repeat reads within the process
+- disk: DiskCache (SQLite) with TTL + LRU eviction, survives restarts
+"""
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from disk_cache import DiskCache
+
+
+CACHE_PATH = os.getenv(
+    "EXTRACTION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache", "extraction_cache.sqlite")
+)
+
+
+def file_digest(source):
+    """SHA-256 hex digest of a file path or bytes."""
+    h = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        h.update(source)
+    else:
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Memory LRU in front of a DiskCache.
+    """
+
+    def __init__(self, path=CACHE_PATH, memory_items=32, memory_bytes=32 * 1024 * 1024,
+                 ttl=30 * 24 * 3600, disk_bytes=200 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite file for the disk tier (None = memory only)
+            memory_items / memory_bytes: Limits of the in-memory tier
+            ttl / disk_bytes: Expiry and size budget of the disk tier
+        """
+        self.memory_items = memory_items
+        self.memory_bytes = memory_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk = DiskCache(path, ttl=ttl, max_bytes=disk_bytes) if path else None
+
+
+    @staticmethod
+    def key(digest, kind):
+        """Cache key: content hash + extractor kind (e.g. file extension)."""
+        return f"{kind}:{digest}"
+
+
+    def get(self, digest, kind):
+        """Return cached text or None."""
+        key = self.key(digest, kind)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        text = self.disk.get(key) if self.disk else None
+        if text is not None:
+            self._remember(key, text)
+        return text
+
+
+    def set(self, digest, kind, text):
+        """Store extracted text in both tiers."""
+        key = self.key(digest, kind)
+        self._remember(key, text)
+        if self.disk:
+            self.disk.set(key, text)
+
+
+    def stats(self):
+        """Memory tier counters plus the disk tier's stats()."""
+        with self._lock:
+            memory = {"items": len(self._memory), "bytes": self._memory_size, "hits": self.memory_hits}
+        return {"memory": memory, "disk": self.disk.stats() if self.disk else None}
+
+
+    def _remember(self, key, text):
+        size = len(text)
+        with self._lock:
+            if key in self._memory:
+                self._memory_size -= len(self._memory.pop(key))
+            self._memory[key] = text
+            self._memory_size += size
+            while self._memory and (len(self._memory) > self.memory_items or self._memory_size > self.memory_bytes):
+                _, old = self._memory.popitem(last=False)
+                self._memory_size -= len(old)
+
+
+# Shared cache used by FileReader
+extraction_cache = ExtractionCache()
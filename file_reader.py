@@ -9,17 +9,151 @@ Handles reading medical reports from various file formats:
 
 Author: Navya
 Date: December 4, 2025
+
+Long PDFs are extracted page-parallel across a process pool;
+iter_pdf_pages() streams pages in order as soon as they are ready.
+
+Extracted text is cached by the SHA-256 of the file bytes
+(extraction_cache.py), so reading the same file again is instant.
+
+read_file() takes a path, bytes or a file-like object (e.g. a Streamlit
+upload) - nothing is written to disk. The format is detected from the
+first bytes of the content, with the file name only as a fallback.
+
+Images go through ocr_engine.py (preprocessing, parallel strips, cache).
+Scanned PDF pages (images, no fonts) are rasterized with PyMuPDF and
+OCR'd in the background while the text pages are extracted normally.
 """
 
 import os
+import io
+import re
+import zipfile
 import PyPDF2
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from docx import Document
 from PIL import Image
+from extraction_cache import extraction_cache, file_digest
+from ocr_engine import OCREngine, TESSERACT_AVAILABLE
 try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
 except ImportError:
-    TESSERACT_AVAILABLE = False
+    PYMUPDF_AVAILABLE = False
+
+
+# PDFs with at least this many pages are split across processes
+PARALLEL_MIN_PAGES = 8
+# Pages per work item (small = first pages arrive sooner)
+PAGES_PER_CHUNK = 4
+
+# Largest file read_file() accepts
+MAX_FILE_BYTES = int(float(os.getenv("FILE_READER_MAX_MB", "25")) * 1024 * 1024)
+READ_CHUNK_BYTES = 1024 * 1024
+
+# Resolution scanned PDF pages are rasterized at for OCR
+OCR_DPI = 200
+
+# Text with more control characters than this (share of the first
+# TEXT_SAMPLE_CHARS) is treated as binary; any NUL byte is binary too
+MAX_CONTROL_SHARE = 0.3
+TEXT_SAMPLE_CHARS = 4096
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f-\x9f]")
+
+
+def _extract_page_range(pdf_bytes, start, stop):
+    """Worker: extract text of pages [start, stop) from an in-memory PDF."""
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _page_has_images(page):
+    """True if a PDF page (PyPDF2) draws an image XObject."""
+    resources = page.get('/Resources')
+    xobjects = resources.get_object().get('/XObject') if resources else None
+    if not xobjects:
+        return False
+    return any(xobjects[name].get_object().get('/Subtype') == '/Image' for name in xobjects.get_object())
+
+
+def _page_is_scanned(page):
+    """Image-only page: draws an image but has no fonts, so no text layer."""
+    resources = page.get('/Resources')
+    if resources and resources.get_object().get('/Font'):
+        return False
+    return _page_has_images(page)
+
+
+def _looks_binary(text):
+    """True if decoded text is really binary data (NUL or mostly control characters)."""
+    sample = text[:TEXT_SAMPLE_CHARS]
+    if "\x00" in sample:
+        return True
+    return len(_CONTROL_RE.findall(sample)) > MAX_CONTROL_SHARE * len(sample)
+
+
+def detect_format(data):
+    """
+    Detect a document format from its content (magic bytes).
+    
+    Args:
+        data (bytes): File content
+        
+    Returns:
+        str: 'pdf', 'docx', 'png', 'jpg' or 'txt', or None if unknown
+            (including binary data that happens to be valid UTF-8)
+    """
+    head = bytes(data[:8])
+    if head.startswith(b"%PDF"):
+        return 'pdf'
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return 'png'
+    if head.startswith(b"\xff\xd8\xff"):
+        return 'jpg'
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return 'docx'
+        except zipfile.BadZipFile:
+            pass
+        return None
+    sample = bytes(data[:TEXT_SAMPLE_CHARS])
+    try:
+        text = sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sample is fine
+        if e.start < TEXT_SAMPLE_CHARS - 3:
+            return None
+        text = sample[:e.start].decode('utf-8')
+    return None if _looks_binary(text) else 'txt'
+
+
+def _load_bytes(source, max_bytes):
+    """
+    Read a path, bytes-like or file-like object into memory,
+    stopping as soon as it grows past max_bytes.
+    
+    Returns:
+        bytes, or None if the content is too large
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source) if len(source) <= max_bytes else None
+    
+    if isinstance(source, (str, os.PathLike)):
+        if os.path.getsize(source) > max_bytes:
+            return None
+        with open(source, 'rb') as file:
+            return _load_bytes(file, max_bytes)
+    
+    buffer = io.BytesIO()
+    while True:
+        chunk = source.read(READ_CHUNK_BYTES)
+        if not chunk:
+            return buffer.getvalue()
+        buffer.write(chunk)
+        if buffer.tell() > max_bytes:
+            return None
 
 
 class FileReader:
@@ -27,8 +161,21 @@ class FileReader:
     A utility class for reading text from various file formats.
     """
     
-    def __init__(self):
-        """Initialize the file reader"""
+    def __init__(self, pdf_workers=None, cache=extraction_cache, max_bytes=MAX_FILE_BYTES, ocr_workers=None):
+        """
+        Initialize the file reader
+        
+        Args:
+            pdf_workers (int): Processes for page-parallel PDF extraction
+                (default: CPU count, 1 = always serial)
+            cache (ExtractionCache): Cache of extracted text (None = off)
+            max_bytes (int): Largest file accepted
+            ocr_workers (int): Processes for image OCR (default: CPU count)
+        """
+        self.pdf_workers = pdf_workers or os.cpu_count() or 1
+        self.cache = cache
+        self.max_bytes = max_bytes
+        self.ocr_engine = OCREngine(workers=ocr_workers, cache=cache)
         self.supported_formats = {
             'pdf': 'PDF Document',
             'docx': 'Word Document',
@@ -43,46 +190,82 @@ class FileReader:
         print(f"📁 Supported formats: {', '.join(self.supported_formats.keys())}")
     
     
-    def read_file(self, file_path):
+    def read_file(self, source, name=None):
         """
-        Read text from a file based on its extension.
+        Read text from a file.
         
         Args:
-            file_path (str): Path to the file
+            source: Path to the file, bytes, or a file-like object
+                (read from its current position)
+            name (str): Original file name, used for messages and as a
+                format hint when the content is not recognized
             
         Returns:
             str: Extracted text from the file
         """
         
-        # Check if file exists
-        if not os.path.exists(file_path):
-            return f"❌ Error: File not found at {file_path}"
-        
-        # Get file extension
-        file_extension = file_path.lower().split('.')[-1]
-        
-        # Check if format is supported
-        if file_extension not in self.supported_formats:
-            return f"❌ Error: Unsupported file format '.{file_extension}'"
+        if isinstance(source, (str, os.PathLike)):
+            file_path = os.fspath(source)
+            
+            # Check if file exists
+            if not os.path.exists(file_path):
+                return f"❌ Error: File not found at {file_path}"
+            
+            name = name or os.path.basename(file_path)
+            
+            # Check if format is supported
+            file_extension = file_path.lower().split('.')[-1]
+            if file_extension not in self.supported_formats:
+                return f"❌ Error: Unsupported file format '.{file_extension}'"
         
-        print(f"\n📄 Reading file: {os.path.basename(file_path)}")
-        print(f"📋 Format: {self.supported_formats[file_extension]}")
+        name = name or getattr(source, 'name', None) or "upload"
+        print(f"\n📄 Reading file: {name}")
         
         try:
+            data = _load_bytes(source, self.max_bytes)
+            if data is None:
+                return f"❌ Error: File is larger than {self.max_bytes // (1024 * 1024)} MB"
+            
+            # Content decides the format; the name is only a fallback
+            hint = name.lower().split('.')[-1] if '.' in name else None
+            file_format = detect_format(data) or hint
+            if file_format == 'jpeg':
+                file_format = 'jpg'
+            if file_format not in self.supported_formats:
+                return "❌ Error: Unrecognized or unsupported file content"
+            
+            print(f"📋 Format: {self.supported_formats[file_format]}")
+            
+            # A .txt name does not make binary content text (checked before
+            # the cache, which may hold text cached before this check existed)
+            if file_format == 'txt' and _looks_binary(bytes(data[:TEXT_SAMPLE_CHARS]).decode('utf-8', 'replace')):
+                return "❌ Error: File content is binary, not text"
+            
+            # Same bytes already extracted? (memory, then disk)
+            digest = None
+            if self.cache is not None:
+                digest = file_digest(data)
+                cached = self.cache.get(digest, file_format)
+                if cached is not None:
+                    print(f"⚡ Cache hit - {len(cached)} characters")
+                    return cached
+            
             # Route to appropriate reader
-            if file_extension == 'pdf':
-                text = self._read_pdf(file_path)
-            elif file_extension in ['docx', 'doc']:
-                text = self._read_word(file_path)
-            elif file_extension == 'txt':
-                text = self._read_text(file_path)
-            elif file_extension in ['jpg', 'jpeg', 'png']:
-                text = self._read_image(file_path)
+            if file_format == 'pdf':
+                text = self._read_pdf(data)
+            elif file_format in ['docx', 'doc']:
+                text = self._read_word(data)
+            elif file_format == 'txt':
+                text = self._read_text(data)
+            elif file_format in ['jpg', 'png']:
+                text = self._read_image(data)
             else:
                 text = "❌ Error: Unsupported file format"
             
             if text and not text.startswith("❌"):
                 print(f"✅ Successfully read {len(text)} characters")
+                if digest:
+                    self.cache.set(digest, file_format, text)
                 return text
             else:
                 return text
@@ -93,44 +276,136 @@ class FileReader:
             return error_msg
     
     
-    def _read_pdf(self, file_path):
-        """Read text from PDF file"""
+    def _read_pdf(self, data):
+        """Read text from PDF bytes"""
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                # Get number of pages
-                num_pages = len(pdf_reader.pages)
-                print(f"   📖 PDF has {num_pages} page(s)")
-                
-                # Extract text from all pages
-                text = ""
-                for page_num in range(num_pages):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
-                
-                if not text.strip():
-                    return "❌ Error: PDF appears to be empty or contains only images"
-                
-                return text.strip()
+            texts = [text for _, text in self.iter_pdf_pages(data)]
+            text = "\n".join(texts)
+            
+            if not text.strip():
+                return "❌ Error: PDF appears to be empty or contains only images"
+            
+            return text.strip()
                 
         except Exception as e:
             return f"❌ Error reading PDF: {str(e)}"
     
     
-    def _read_word(self, file_path):
-        """Read text from Word document"""
+    def iter_pdf_pages(self, source):
+        """
+        Extract PDF text page by page.
+        
+        Long documents are split into chunks extracted in parallel
+        processes; pages are still yielded in order, each as soon as it
+        (and every page before it) is done. Scanned pages are OCR'd in
+        a background thread at the same time and merged in place.
+        
+        Args:
+            source: Path to the PDF, or its bytes
+            
+        Yields:
+            (page_number, text) with 1-based page numbers
+        """
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as file:
+                pdf_bytes = file.read()
+        else:
+            pdf_bytes = bytes(source)
+        
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+        num_pages = len(pdf_reader.pages)
+        print(f"   📖 PDF has {num_pages} page(s)")
+        
+        ocr_enabled = TESSERACT_AVAILABLE and PYMUPDF_AVAILABLE
+        scanned = [i for i in range(num_pages) if _page_is_scanned(pdf_reader.pages[i])] if ocr_enabled else []
+        if not scanned:
+            yield from self._iter_text_pages(pdf_bytes, pdf_reader, num_pages)
+            return
+        
+        print(f"   🔍 {len(scanned)} scanned page(s) - running OCR")
+        with ThreadPoolExecutor(max_workers=1) as background:
+            ocr_future = background.submit(self._ocr_pdf_pages, pdf_bytes, scanned)
+            for page_no, text in self._iter_text_pages(pdf_bytes, pdf_reader, num_pages, skip=set(scanned)):
+                if page_no - 1 in scanned:
+                    text = ocr_future.result().get(page_no - 1)
+                    if text is None:  # OCR failed: fall back to the text layer
+                        text = pdf_reader.pages[page_no - 1].extract_text() or ""
+                elif not text.strip() and _page_has_images(pdf_reader.pages[page_no - 1]):
+                    # Has fonts but no extractable text (e.g. only a logo font)
+                    text = self._ocr_pdf_pages(pdf_bytes, [page_no - 1]).get(page_no - 1, text)
+                yield page_no, text
+    
+    
+    def _iter_text_pages(self, pdf_bytes, pdf_reader, num_pages, skip=()):
+        """Text-layer extraction for iter_pdf_pages ('' for pages in skip)."""
+        if self.pdf_workers <= 1 or num_pages - len(skip) < PARALLEL_MIN_PAGES:
+            for page_num in range(num_pages):
+                text = "" if page_num in skip else pdf_reader.pages[page_num].extract_text() or ""
+                yield page_num + 1, text
+            return
+        
+        workers = min(self.pdf_workers, -(-num_pages // PAGES_PER_CHUNK))
+        print(f"   ⚡ Extracting in parallel ({workers} workers)")
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = [
+                (start, pool.submit(_extract_page_range, pdf_bytes, start, min(start + PAGES_PER_CHUNK, num_pages)))
+                for start in range(0, num_pages, PAGES_PER_CHUNK)
+            ]
+            try:
+                for start, future in chunks:
+                    for offset, text in enumerate(future.result()):
+                        yield start + offset + 1, text
+            finally:
+                # Stop queued work if the caller stops reading early
+                for _, future in chunks:
+                    future.cancel()
+    
+    
+    def _ocr_pdf_pages(self, pdf_bytes, page_indexes):
+        """
+        OCR the given 0-based pages (together, or one by one if that fails).
+        
+        Returns:
+            {page index: text}, without the pages whose OCR failed
+        """
+        try:
+            return self._ocr_page_batch(pdf_bytes, page_indexes)
+        except Exception as e:
+            if len(page_indexes) == 1:
+                print(f"   ⚠️ OCR failed on page {page_indexes[0] + 1}: {e}")
+                return {}
+            texts = {}
+            for index in page_indexes:
+                texts.update(self._ocr_pdf_pages(pdf_bytes, [index]))
+            return texts
+    
+    
+    def _ocr_page_batch(self, pdf_bytes, page_indexes):
+        """Rasterize the given 0-based pages and OCR them together."""
+        doc = pymupdf.open(stream=pdf_bytes, filetype="pdf")
         try:
-            doc = Document(file_path)
+            images = []
+            for index in page_indexes:
+                pixmap = doc[index].get_pixmap(dpi=OCR_DPI, colorspace=pymupdf.csGRAY)
+                images.append(Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples))
+        finally:
+            doc.close()
+        results = self.ocr_engine.ocr_many(images)
+        return {index: result["text"] for index, result in zip(page_indexes, results)}
+    
+    
+    def _read_word(self, data):
+        """Read text from Word document bytes"""
+        try:
+            doc = Document(io.BytesIO(data))
             
             # Get number of paragraphs
             num_paragraphs = len(doc.paragraphs)
             print(f"   📝 Document has {num_paragraphs} paragraph(s)")
             
             # Extract text from all paragraphs
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+            text = "\n".join(paragraph.text for paragraph in doc.paragraphs)
             
             if not text.strip():
                 return "❌ Error: Word document appears to be empty"
@@ -141,11 +416,10 @@ class FileReader:
             return f"❌ Error reading Word document: {str(e)}"
     
     
-    def _read_text(self, file_path):
-        """Read text from plain text file"""
+    def _read_text(self, data):
+        """Read text from plain text bytes"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                text = file.read()
+            text = data.decode('utf-8')
             
             if not text.strip():
                 return "❌ Error: Text file is empty"
@@ -156,8 +430,8 @@ class FileReader:
             return f"❌ Error reading text file: {str(e)}"
     
     
-    def _read_image(self, file_path):
-        """Read text from image using OCR"""
+    def _read_image(self, data):
+        """Read text from image bytes using OCR"""
         
         if not TESSERACT_AVAILABLE:
             return """❌ Error: OCR not available. 
@@ -170,12 +444,9 @@ To enable image reading, install Tesseract OCR:
 Then try again."""
         
         try:
-            # Open image
-            image = Image.open(file_path)
-            print(f"   🖼️ Image size: {image.size}")
-            
-            # Extract text using OCR
-            text = pytesseract.image_to_string(image)
+            result = self.ocr_engine.ocr(data)
+            print(f"   🖼️ Image size: {result['size']} ({result['seconds']:.1f}s)")
+            text = result["text"]
             
             if not text.strip():
                 return "❌ Error: No text found in image. Image may not contain text or text is unclear."
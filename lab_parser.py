@@ -0,0 +1,267 @@
+"""
+Lab Parser - Structured Lab Values from Report Text
+===================================================
+Pulls analyte, value, unit, reference range and flag out of report text
+(typed notes or FileReader output, including the one-cell-per-line text
+PyPDF2 produces for tabular lab PDFs):
+
+    "Fasting glucose 186 mg/dL (70-99), HbA1c 8.2% (<5.7)"
+    -> LabValue("Fasting Glucose", 186.0, "mg/dL", 70.0, 99.0, "high"), ...
+
+format_lab_table() turns the records into a compact table that Agent 1
+gets instead of the whole document.
+"""
+
+import re
+from dataclasses import dataclass
+
+
+# Canonical analyte name -> aliases (lowercase, longest match wins)
+ANALYTES = {
+    "Fasting Glucose": ("fasting glucose", "fasting blood sugar", "fasting blood glucose", "fbs", "fpg",
+                        "glucose fasting", "blood sugar fasting"),
+    "Post-meal Glucose": ("postprandial glucose", "post prandial glucose", "ppbs", "pp blood sugar",
+                          "glucose pp", "post meal glucose"),
+    "Random Glucose": ("random glucose", "random blood sugar", "rbs"),
+    "Glucose": ("glucose", "blood sugar"),
+    "HbA1c": ("hba1c", "glycated hemoglobin", "glycosylated hemoglobin", "a1c"),
+    "Total Cholesterol": ("total cholesterol", "cholesterol total", "serum cholesterol", "cholesterol"),
+    "LDL Cholesterol": ("ldl cholesterol", "ldl-c", "ldl"),
+    "HDL Cholesterol": ("hdl cholesterol", "hdl-c", "hdl"),
+    "Triglycerides": ("triglycerides", "triglyceride", "tg"),
+    "Hemoglobin": ("hemoglobin", "haemoglobin", "hb", "hgb"),
+    "Iron": ("serum iron", "iron"),
+    "Ferritin": ("serum ferritin", "ferritin"),
+    "Vitamin B12": ("vitamin b12", "vit b12", "cobalamin", "b12"),
+    "Vitamin D2": ("25 (oh) vit d2", "vitamin d2", "vit d2"),
+    "Vitamin D3": ("25 (oh) vit d3", "vitamin d3", "vit d3"),
+    "Vitamin D": ("vitamin d total", "25 oh vitamin d", "25-hydroxy vitamin d", "vitamin d", "vit d"),
+    "TSH": ("tsh", "thyroid stimulating hormone"),
+    "T3": ("total t3", "t3"),
+    "T4": ("total t4", "t4"),
+    "Creatinine": ("serum creatinine", "creatinine"),
+    "Urea": ("blood urea", "urea", "bun"),
+    "Uric Acid": ("uric acid",),
+    "ALT (SGPT)": ("sgpt", "alt"),
+    "AST (SGOT)": ("sgot", "ast"),
+    "Calcium": ("serum calcium", "calcium"),
+    "Sodium": ("serum sodium", "sodium"),
+    "Potassium": ("serum potassium", "potassium"),
+    "Platelets": ("platelet count", "platelets"),
+    "WBC": ("total leucocyte count", "total wbc count", "wbc", "tlc"),
+}
+
+UNITS = (
+    "mg/dL", "g/dL", "µg/dL", "ug/dL", "mcg/dL", "ng/mL", "pg/mL", "ng/dL", "mIU/L", "µIU/mL",
+    "uIU/mL", "mIU/mL", "mmol/L", "mEq/L", "µmol/L", "umol/L", "IU/L", "U/L", "lakhs/cumm",
+    "cells/cumm", "/cumm", "10^3/µL", "fL", "mm/hr", "%",
+)
+
+# Words after a value that state the flag explicitly
+FLAG_WORDS = {
+    "h": "high", "high": "high", "elevated": "high", "raised": "high",
+    "l": "low", "low": "low", "deficient": "low", "deficiency": "low", "decreased": "low",
+    "normal": "normal",
+}
+
+# How far after an analyte name its value may appear
+WINDOW_CHARS = 250
+
+_NUMBER = r"(?:\d{1,3}(?:,\d{2,3})+|\d+)(?:\.\d+)?"
+
+
+def _alias_pattern(alias):
+    """'vitamin b12' -> matches 'Vitamin B12', 'Vitamin - B12', 'Vitamin B 12'."""
+    tokens = re.findall(r"[a-z]+|\d+", alias)
+    return r"[\s\-()]*".join(re.escape(token) for token in tokens)
+
+
+_ALIASES = sorted(
+    ((alias, name) for name, aliases in ANALYTES.items() for alias in aliases),
+    key=lambda pair: -len(pair[0])
+)
+_ALIAS_NAMES = {}
+_alias_groups = []
+for _index, (_alias, _name) in enumerate(_ALIASES):
+    _ALIAS_NAMES[f"a{_index}"] = _name
+    _alias_groups.append(f"(?P<a{_index}>{_alias_pattern(_alias)})")
+_ANALYTE_RE = re.compile(r"(?<![a-z0-9])(?:" + "|".join(_alias_groups) + r")(?![a-z0-9])", re.IGNORECASE)
+
+UNIT_RE = re.compile(
+    r"(?<![a-z])(" + "|".join(re.escape(unit) for unit in sorted(UNITS, key=len, reverse=True)) + r")",
+    re.IGNORECASE
+)
+_RANGE_RE = re.compile(
+    r"(?:\b(?P<label>normal|sufficiency|reference|ref\.?|optimal|desirable))?[\s:]*"
+    rf"(?P<low>{_NUMBER})\s*(?:-|–|to)\s*(?P<high>{_NUMBER})",
+    re.IGNORECASE
+)
+_BOUND_RE = re.compile(rf"(?P<op><=|>=|<|>|≤|≥)\s*(?P<bound>{_NUMBER})")
+_VALUE_RE = re.compile(rf"(?<![\w.,]){_NUMBER}(?![\d.]|,\d)")
+_FLAG_RE = re.compile(r"^[\s:()\-*]*(" + "|".join(sorted(FLAG_WORDS, key=len, reverse=True)) + r")\b", re.IGNORECASE)
+# Parts of a result row that never hold the value
+_NOISE_RE = re.compile(
+    r"method\s*:[^0-9]*|\d{1,2}[-/][a-z]{3}[-/]\d{2,4}|\d{1,2}:\d{2}|page \d+ of \d+",
+    re.IGNORECASE
+)
+_STOP_RE = re.compile(r"interpretation|comments?\b|•|-{5,}", re.IGNORECASE)
+
+
+@dataclass
+class LabValue:
+    """One measured value from a lab report."""
+    analyte: str
+    value: float
+    unit: str = ""
+    low: float = None
+    high: float = None
+    flag: str = ""  # "low", "high", "normal" or "" (unknown)
+
+    def range_text(self):
+        if self.low is not None and self.high is not None:
+            return f"{self.low:g}-{self.high:g}"
+        if self.high is not None:
+            return f"<{self.high:g}"
+        if self.low is not None:
+            return f">{self.low:g}"
+        return ""
+
+
+def _to_float(text):
+    return float(text.replace(",", ""))
+
+
+def _mask(text, spans):
+    """Blank out spans so numbers inside them are not taken as values."""
+    chars = list(text)
+    for start, end in spans:
+        chars[start:end] = " " * (end - start)
+    return "".join(chars)
+
+
+def _parse_window(name, window):
+    """Read value, unit, range and flag from the text after an analyte name."""
+    window = _NOISE_RE.sub(lambda m: " " * len(m.group()), window)
+
+    low = high = None
+    taken = []
+    ranges = list(_RANGE_RE.finditer(window))
+    if ranges:
+        best = next((m for m in ranges if m.group("label")), ranges[0])
+        low, high = _to_float(best.group("low")), _to_float(best.group("high"))
+        taken += [m.span() for m in ranges]
+
+    bounds = list(_BOUND_RE.finditer(_mask(window, taken)))
+    for m in bounds:
+        if low is None and high is None:
+            if m.group("op") in ("<", "<=", "≤"):
+                high = _to_float(m.group("bound"))
+            else:
+                low = _to_float(m.group("bound"))
+        taken.append(m.span())
+
+    value_match = _VALUE_RE.search(_mask(window, taken))
+    if not value_match:
+        return None
+    value = _to_float(value_match.group())
+
+    unit_match = UNIT_RE.search(window)
+    unit = unit_match.group(1) if unit_match else ""
+
+    after = window[value_match.end():]
+    if unit and after.lower().lstrip().startswith(unit.lower()):
+        after = after.lstrip()[len(unit):]
+    flag_match = _FLAG_RE.match(after)
+    if flag_match:
+        flag = FLAG_WORDS[flag_match.group(1).lower()]
+    elif low is not None and value < low:
+        flag = "low"
+    elif high is not None and value > high:
+        flag = "high"
+    elif low is not None or high is not None:
+        flag = "normal"
+    else:
+        flag = ""
+
+    return LabValue(name, value, unit, low, high, flag)
+
+
+def parse_lab_values(text):
+    """
+    Extract lab values from report text.
+
+    Args:
+        text: Report text (typed or from FileReader)
+
+    Returns:
+        List of LabValue in order of appearance, one per analyte
+        (the first mention that has a value - interpretation notes
+        that repeat the analyte name are skipped)
+    """
+    if not text:
+        return []
+    text = re.sub(r"\s+", " ", text.replace("\xa0", " "))
+    matches = list(_ANALYTE_RE.finditer(text))
+
+    values = []
+    seen = set()
+    for i, match in enumerate(matches):
+        name = _ALIAS_NAMES[match.lastgroup]
+        if name in seen:
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        window = text[match.end():min(end, match.end() + WINDOW_CHARS)]
+        stop = _STOP_RE.search(window)
+        if stop:
+            window = window[:stop.start()]
+        lab_value = _parse_window(name, window)
+        if lab_value:
+            values.append(lab_value)
+            seen.add(name)
+    return values
+
+
+# Words that carry no information once a line's values are in the table
+_TABLE_WORDS = set(FLAG_WORDS) | {"normal", "reference", "ref", "range", "interval", "result", "results",
+                                  "value", "values", "unit", "units", "flag", "test", "to", "sufficiency",
+                                  "optimal", "desirable", "name", "biological", "observed", "investigation",
+                                  "parameter"}
+
+
+def unparsed_lines(text, values):
+    """
+    Lines of text with something besides the parsed values: other tests,
+    diagnoses, the clinician's impression, ...
+
+    A line is dropped only if, after removing the parsed analytes'
+    names, numbers, units, ranges and flag words, no word is left.
+
+    Returns:
+        List of the kept lines (stripped, original wording)
+    """
+    names = {v.analyte for v in values}
+    kept = []
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        rest = _ANALYTE_RE.sub(lambda m: " " if _ALIAS_NAMES[m.lastgroup] in names else m.group(), line)
+        rest = _NOISE_RE.sub(" ", UNIT_RE.sub(" ", rest))
+        if any(word.lower() not in _TABLE_WORDS for word in re.findall(r"[^\W\d_]{2,}", rest)):
+            kept.append(line)
+    return kept
+
+
+def format_lab_table(values):
+    """
+    Compact pipe table of lab values for prompts.
+
+    Returns:
+        str (empty if there are no values)
+    """
+    if not values:
+        return ""
+    lines = ["Test | Value | Unit | Normal range | Flag"]
+    for v in values:
+        lines.append(f"{v.analyte} | {v.value:g} | {v.unit} | {v.range_text()} | {v.flag.upper()}")
+    return "\n".join(lines)
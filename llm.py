@@ -2,22 +2,379 @@
 LLM Client - Simple Groq Connection
 ====================================
 One file. One client. All agents use this.
+
+Completions go through chat() / stream_chat(), which check a persistent
+response cache first: the same model + messages + sampling params are
+answered from disk instead of calling Groq again.
+
+The client itself is built lazily on first use and shared by every
+Streamlit script thread: pooled keep-alive connections, per-call timeouts,
+and retries with jittered exponential backoff on 429/5xx (honoring the
+server's Retry-After header). Every request to Groq first waits for
+admission from a process-wide RPM/TPM scheduler (rate_limiter.py), and
+every call's latency and token usage is recorded in metrics.py.
 """
 
 import os
+import json
+import time
+import random
+import hashlib
+import threading
+from email.utils import parsedate_to_datetime
+
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, APIConnectionError, APIStatusError
+
+from disk_cache import DiskCache
+from rate_limiter import RateScheduler, CHARS_PER_TOKEN
+from metrics import registry as metrics
 
 load_dotenv()
 
-# Initialize Groq client (OpenAI-compatible)
-client = OpenAI(
-    api_key=os.getenv("GROQ_API_KEY"),
-    base_url="https://api.groq.com/openai/v1"
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+
+# Timeouts (seconds) - per call, can be overridden with chat(..., timeout=)
+REQUEST_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 90))
+CONNECT_TIMEOUT = 10.0
+
+# Connection pool shared by all sessions
+POOL_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=30.0
 )
 
+# Retry policy for throttling / server errors
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+BACKOFF_BASE = 1.0        # first retry waits up to 1s, then 2s, 4s, ...
+BACKOFF_MAX = 20.0        # cap for our own backoff
+RETRY_AFTER_MAX = 60.0    # cap for server-requested waits
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the shared Groq client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                timeout = httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+                _client = OpenAI(
+                    api_key=os.getenv("GROQ_API_KEY"),
+                    base_url=GROQ_BASE_URL,
+                    timeout=timeout,
+                    max_retries=0,  # retries are handled by _create_with_retry
+                    http_client=httpx.Client(limits=POOL_LIMITS, timeout=timeout)
+                )
+    return _client
+
+
+def __getattr__(name):
+    # Keep `from llm import client` working without building it at import time
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Available models (for reference)
 MODELS = {
     "fast": "llama-3.1-8b-instant",      # Fast responses, good for Q&A
     "smart": "llama-3.3-70b-versatile",  # Best reasoning, good for analysis
 }
+
+# Per-model Groq budgets (requests and tokens per minute), keyed like MODELS.
+# Override with e.g. LLM_RPM_FAST=60 LLM_TPM_SMART=60000 for paid tiers.
+RATE_LIMITS = {
+    "fast": {"rpm": 30, "tpm": 6000},
+    "smart": {"rpm": 30, "tpm": 12000},
+}
+
+scheduler = RateScheduler({
+    MODELS[name]: {
+        "rpm": int(os.getenv(f"LLM_RPM_{name.upper()}", limits["rpm"])),
+        "tpm": int(os.getenv(f"LLM_TPM_{name.upper()}", limits["tpm"]))
+    }
+    for name, limits in RATE_LIMITS.items()
+})
+
+# Response cache (set LLM_CACHE_DISABLED=1 to always call Groq)
+CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cache", "llm_cache.sqlite")
+)
+
+if os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+    cache = None
+else:
+    cache = DiskCache(
+        CACHE_PATH,
+        ttl=float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600)),
+        max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", 50)) * 1024 * 1024)
+    )
+
+
+def cache_key(model, messages, **params):
+    """Content hash of everything that determines a completion."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_stats():
+    """Hit/miss counters and size of the response cache (None if disabled)."""
+    return cache.stats() if cache else None
+
+
+def _is_retryable(error):
+    """Throttling, server errors and dropped connections are worth retrying."""
+    if isinstance(error, APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def _retry_after(error):
+    """Seconds the server asked us to wait (Retry-After header), if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(attempt, error):
+    """Delay before retry number `attempt` (0-based)."""
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        # Small jitter so sessions told the same thing don't retry in lockstep
+        return min(retry_after, RETRY_AFTER_MAX) + random.uniform(0, 0.25)
+    # Full jitter exponential backoff
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _wait_before_retry(attempt, error, model):
+    """Raise if the error is final, otherwise sleep for the backoff delay."""
+    if attempt >= MAX_RETRIES or not _is_retryable(error):
+        raise error
+    delay = _backoff_delay(attempt, error)
+    if isinstance(error, APIStatusError) and error.status_code == 429:
+        # Everyone on this model is over budget - hold the whole queue
+        scheduler.pause(model, delay)
+    print(f"⚠️ LLM call failed ({error.__class__.__name__}), retry {attempt + 1}/{MAX_RETRIES} in {delay:.1f}s")
+    time.sleep(delay)
+
+
+def _settle_estimated(admission, max_tokens, completion=""):
+    """Settle a call without reported usage: estimated prompt + the output actually received."""
+    scheduler.settle(admission, admission.tokens - max_tokens + len(completion) // CHARS_PER_TOKEN)
+
+
+def _create_with_retry(**kwargs):
+    """
+    chat.completions.create with rate-limit admission and backoff on retryable errors.
+    
+    Returns:
+        (response, seconds spent queued by the rate limiter)
+    """
+    model = kwargs["model"]
+    queued = 0.0
+    attempt = 0
+    while True:
+        admission = scheduler.acquire(model, kwargs["messages"], kwargs["max_tokens"])
+        queued += admission.queued
+        try:
+            response = get_client().chat.completions.create(**kwargs)
+        except Exception as e:
+            # No completion came back - give the unused output budget back
+            _settle_estimated(admission, kwargs["max_tokens"])
+            _wait_before_retry(attempt, e, model)
+            attempt += 1
+            continue
+        
+        usage = getattr(response, "usage", None)
+        scheduler.settle(admission, usage.total_tokens if usage else None)
+        return response, queued
+
+
+def _stream_usage(chunk):
+    """Token usage carried by a stream chunk, if any (OpenAI `usage` or Groq `x_groq.usage`)."""
+    usage = getattr(chunk, "usage", None)
+    if usage is None:
+        x_groq = getattr(chunk, "x_groq", None)
+        usage = x_groq.get("usage") if isinstance(x_groq, dict) else getattr(x_groq, "usage", None)
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    return usage.prompt_tokens, usage.completion_tokens
+
+
+def chat(model, messages, temperature=0.7, max_tokens=1000, timeout=None, agent=None,
+         response_format=None):
+    """
+    Run a chat completion, answering from the response cache when possible.
+    
+    Args:
+        agent: Label for metrics (e.g. "agent1")
+        response_format: e.g. {"type": "json_object"} for JSON mode
+    
+    Returns:
+        Completion text
+    """
+    params = {"temperature": temperature, "max_tokens": max_tokens}
+    if response_format:
+        params["response_format"] = response_format
+    key = cache_key(model, messages, **params)
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            metrics.record_cache_hit(agent)
+            return json.loads(cached)["content"]
+    
+    start = time.perf_counter()
+    try:
+        response, queued = _create_with_retry(
+            model=model,
+            messages=messages,
+            timeout=timeout or REQUEST_TIMEOUT,
+            **params
+        )
+    except Exception:
+        metrics.record_error(agent, model)
+        raise
+    wall = time.perf_counter() - start
+    
+    choice = response.choices[0]
+    content = choice.message.content
+    usage = getattr(response, "usage", None)
+    metrics.record_call(
+        agent, model, wall,
+        queue=queued,
+        ttft=wall,  # non-streaming: the first token arrives with the whole answer
+        prompt_tokens=usage.prompt_tokens if usage else None,
+        completion_tokens=usage.completion_tokens if usage else None,
+        finish_reason=choice.finish_reason
+    )
+    
+    if cache and content:
+        cache.set(key, json.dumps({"content": content, "finish_reason": choice.finish_reason}))
+    
+    return content
+
+
+def stream_chat(model, messages, temperature=0.7, max_tokens=1000, timeout=None, agent=None,
+                response_format=None):
+    """
+    Stream a chat completion from Groq.
+    
+    A cached response is yielded as a single delta. A fresh response is
+    only cached once the stream has been consumed to the end. Failures are
+    retried only until the first delta has been yielded.
+    
+    Args:
+        response_format: e.g. {"type": "json_object"} for JSON mode
+    
+    Yields:
+        Text deltas as they arrive (empty keep-alive chunks are skipped)
+    """
+    params = {"temperature": temperature, "max_tokens": max_tokens}
+    if response_format:
+        params["response_format"] = response_format
+    key = cache_key(model, messages, **params)
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            metrics.record_cache_hit(agent)
+            yield json.loads(cached)["content"]
+            return
+    
+    start = time.perf_counter()
+    ttft = None
+    queued = 0.0
+    usage = None
+    parts = []
+    finish_reason = None
+    attempt = 0
+    while True:
+        admission = scheduler.acquire(model, messages, max_tokens)
+        queued += admission.queued
+        try:
+            stream = get_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                stream=True,
+                timeout=timeout or REQUEST_TIMEOUT,
+                **params
+            )
+            for chunk in stream:
+                usage = _stream_usage(chunk) or usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                if choice.delta.content:
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    parts.append(choice.delta.content)
+                    yield choice.delta.content
+            break
+        except GeneratorExit:
+            # The caller stopped reading - settle what was received so far
+            _settle_estimated(admission, max_tokens, "".join(parts))
+            raise
+        except Exception as e:
+            _settle_estimated(admission, max_tokens, "".join(parts))
+            try:
+                if parts:
+                    raise  # the caller has already shown partial output
+                _wait_before_retry(attempt, e, model)
+            except Exception:
+                metrics.record_error(agent, model)
+                raise
+            attempt += 1
+    
+    completion = "".join(parts)
+    prompt_tokens, completion_tokens = usage if usage else (None, None)
+    if usage:
+        scheduler.settle(admission, (prompt_tokens or 0) + (completion_tokens or 0))
+    else:
+        _settle_estimated(admission, max_tokens, completion)
+    
+    metrics.record_call(
+        agent, model, time.perf_counter() - start,
+        queue=queued,
+        ttft=ttft,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        finish_reason=finish_reason
+    )
+    
+    if cache and parts:
+        cache.set(key, json.dumps({"content": completion, "finish_reason": finish_reason}))
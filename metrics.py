@@ -0,0 +1,188 @@
+"""
+Metrics - Per-Agent LLM Latency and Token Usage
+===============================================
+llm.chat() / llm.stream_chat() record one entry per call here:
+wall time, time spent queued by the rate limiter, time to first token,
+prompt/completion tokens, model and finish_reason.
+
+- registry.summary()       -> per-agent rows for the Dashboard
+- registry.to_prometheus() -> Prometheus text exposition format
+
+Process-wide (all Streamlit sessions share it), in memory only.
+"""
+
+import threading
+from collections import deque
+
+
+# Histogram buckets in seconds - LLM calls range from ~0.2s to minutes
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+RECENT_CALLS = 500  # raw samples kept per agent for percentiles
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of LLM call metrics keyed by (agent, model).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+
+    def reset(self):
+        with self._lock:
+            self._wall = {}          # (agent, model) -> Histogram
+            self._queue = {}
+            self._ttft = {}
+            self._prompt_tokens = {}
+            self._completion_tokens = {}
+            self._finish = {}        # (agent, model, finish_reason) -> count
+            self._errors = {}        # (agent, model) -> count
+            self._cache_hits = {}    # agent -> count
+            self._recent = {}        # agent -> deque of call dicts
+
+
+    def record_call(self, agent, model, wall, queue=0.0, ttft=None,
+                    prompt_tokens=None, completion_tokens=None, finish_reason=None):
+        """Record one completed call to the API."""
+        agent = agent or "unknown"
+        key = (agent, model)
+        with self._lock:
+            self._wall.setdefault(key, Histogram()).observe(wall)
+            self._queue.setdefault(key, Histogram()).observe(queue)
+            if ttft is not None:
+                self._ttft.setdefault(key, Histogram()).observe(ttft)
+            self._prompt_tokens[key] = self._prompt_tokens.get(key, 0) + (prompt_tokens or 0)
+            self._completion_tokens[key] = self._completion_tokens.get(key, 0) + (completion_tokens or 0)
+            finish_key = (agent, model, finish_reason or "unknown")
+            self._finish[finish_key] = self._finish.get(finish_key, 0) + 1
+            self._recent.setdefault(agent, deque(maxlen=RECENT_CALLS)).append({
+                "model": model,
+                "wall": wall,
+                "queue": queue,
+                "ttft": ttft,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "finish_reason": finish_reason
+            })
+
+
+    def record_error(self, agent, model):
+        """Record a call that failed after all retries."""
+        key = (agent or "unknown", model)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+
+    def record_cache_hit(self, agent):
+        """Record a call answered from the response cache (no API call)."""
+        agent = agent or "unknown"
+        with self._lock:
+            self._cache_hits[agent] = self._cache_hits.get(agent, 0) + 1
+
+
+    def summary(self):
+        """
+        Per-agent summary for display.
+
+        Returns:
+            List of dicts (one per agent, sorted by name)
+        """
+        with self._lock:
+            agents = sorted(set(self._recent) | set(self._cache_hits) | {a for a, _ in self._errors})
+            rows = []
+            for agent in agents:
+                calls = list(self._recent.get(agent, []))
+                walls = [c["wall"] for c in calls]
+                ttfts = [c["ttft"] for c in calls if c["ttft"] is not None]
+                queues = [c["queue"] for c in calls]
+                rows.append({
+                    "agent": agent,
+                    "model": calls[-1]["model"] if calls else "",
+                    "calls": sum(h.count for (a, _), h in self._wall.items() if a == agent),
+                    "cache_hits": self._cache_hits.get(agent, 0),
+                    "errors": sum(n for (a, _), n in self._errors.items() if a == agent),
+                    "p50_s": _percentile(walls, 50),
+                    "p95_s": _percentile(walls, 95),
+                    "ttft_p50_s": _percentile(ttfts, 50),
+                    "queue_avg_s": sum(queues) / len(queues) if queues else None,
+                    "prompt_tokens": sum(n for (a, _), n in self._prompt_tokens.items() if a == agent),
+                    "completion_tokens": sum(n for (a, _), n in self._completion_tokens.items() if a == agent)
+                })
+            return rows
+
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, help_text, series in (
+                ("llm_request_duration_seconds", "Wall time of LLM calls including queueing and retries", self._wall),
+                ("llm_queue_wait_seconds", "Time spent waiting for rate limiter admission", self._queue),
+                ("llm_time_to_first_token_seconds", "Time from call start to the first token", self._ttft),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (agent, model), hist in sorted(series.items()):
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_labels(agent=agent, model=model, le=bound)} {count}")
+                    lines.append(f"{name}_bucket{_labels(agent=agent, model=model, le='+Inf')} {hist.count}")
+                    lines.append(f"{name}_sum{_labels(agent=agent, model=model)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{_labels(agent=agent, model=model)} {hist.count}")
+
+            for name, help_text, series in (
+                ("llm_prompt_tokens_total", "Prompt tokens sent", self._prompt_tokens),
+                ("llm_completion_tokens_total", "Completion tokens received", self._completion_tokens),
+                ("llm_errors_total", "Calls that failed after all retries", self._errors),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (agent, model), value in sorted(series.items()):
+                    lines.append(f"{name}{_labels(agent=agent, model=model)} {value}")
+
+            lines.append("# HELP llm_requests_total Completed LLM calls by finish reason")
+            lines.append("# TYPE llm_requests_total counter")
+            for (agent, model, reason), value in sorted(self._finish.items()):
+                lines.append(f"llm_requests_total{_labels(agent=agent, model=model, finish_reason=reason)} {value}")
+
+            lines.append("# HELP llm_cache_hits_total Calls answered from the response cache")
+            lines.append("# TYPE llm_cache_hits_total counter")
+            for agent, value in sorted(self._cache_hits.items()):
+                lines.append(f"llm_cache_hits_total{_labels(agent=agent)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry used by llm.py
+registry = MetricsRegistry()
@@ -0,0 +1,215 @@
+"""
+OCR Engine - Text from Photos and Scans of Lab Reports
+======================================================
+Wraps pytesseract with the steps that make phone photos fast:
+
+1. Preprocess: fix EXIF rotation, grayscale, downscale to MAX_WIDTH,
+   stretch contrast and binarize (Otsu threshold)
+2. Split tall images into horizontal strips, cutting only at blank rows
+   so no line of text is cut in half
+3. OCR the strips in a process pool (one Tesseract per strip)
+4. Cache the text by image hash (extraction_cache.py)
+
+Every call returns the time it took, so slow images are easy to spot.
+"""
+
+import io
+import os
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+from extraction_cache import extraction_cache
+try:
+    import pytesseract
+    pytesseract.get_tesseract_version()  # the package is useless without the tesseract binary
+    TESSERACT_AVAILABLE = True
+except (ImportError, OSError):
+    TESSERACT_AVAILABLE = False
+
+
+# Wider images are downscaled (~300 DPI for a letter-size page)
+MAX_WIDTH = 2400
+# Taller images are split into strips of about STRIP_HEIGHT rows
+STRIP_HEIGHT = 1000
+# How far (rows) from the ideal cut to look for a blank row
+CUT_SEARCH = 150
+# A row is blank if its mean brightness is at least this (0-255)
+BLANK_ROW = 250
+# Seconds Tesseract may spend on one strip
+OCR_TIMEOUT = 60
+
+
+def _ocr_strip(mode, size, pixels, lang, config):
+    """Worker: OCR one preprocessed strip (raw pixels keep pickling cheap)."""
+    image = Image.frombytes(mode, size, pixels)
+    return pytesseract.image_to_string(image, lang=lang, config=config, timeout=OCR_TIMEOUT)
+
+
+def _otsu_threshold(image):
+    """Otsu's threshold for a grayscale image, from its histogram."""
+    histogram = image.histogram()[:256]
+    total = sum(histogram)
+    sum_all = sum(i * count for i, count in enumerate(histogram))
+    sum_back = weight_back = 0
+    best, threshold = -1.0, 128
+    for i, count in enumerate(histogram):
+        weight_back += count
+        if weight_back == 0:
+            continue
+        weight_fore = total - weight_back
+        if weight_fore == 0:
+            break
+        sum_back += i * count
+        mean_back = sum_back / weight_back
+        mean_fore = (sum_all - sum_back) / weight_fore
+        between = weight_back * weight_fore * (mean_back - mean_fore) ** 2
+        if between > best:
+            best, threshold = between, i
+    return threshold
+
+
+def preprocess(image, max_width=MAX_WIDTH):
+    """
+    Prepare an image for Tesseract.
+
+    Returns:
+        Black-on-white grayscale ('L') image no wider than max_width
+    """
+    image = ImageOps.exif_transpose(image)
+    image = image.convert('L')
+    if image.width > max_width:
+        height = round(image.height * max_width / image.width)
+        image = image.resize((max_width, height), Image.Resampling.LANCZOS)
+    image = ImageOps.autocontrast(image, cutoff=1)
+    threshold = _otsu_threshold(image)
+    return image.point(lambda p: 255 if p > threshold else 0)
+
+
+def find_strips(image, strip_height=STRIP_HEIGHT, search=CUT_SEARCH):
+    """
+    Split points for a tall image, placed on blank rows.
+
+    Returns:
+        List of (top, bottom) row ranges covering the image
+    """
+    height = image.height
+    if height <= strip_height * 1.5:
+        return [(0, height)]
+
+    # Mean brightness of every row (a 1-pixel-wide box resize)
+    rows = list(image.resize((1, height), Image.Resampling.BOX).getdata())
+
+    strips = []
+    top = 0
+    while height - top > strip_height * 1.5:
+        ideal = top + strip_height
+        window = range(max(top + 1, ideal - search), min(height - 1, ideal + search))
+        # Blank row closest to the ideal cut, else the lightest row
+        blank = [row for row in window if rows[row] >= BLANK_ROW]
+        if blank:
+            cut = min(blank, key=lambda row: abs(row - ideal))
+        else:
+            cut = max(window, key=lambda row: rows[row])
+        strips.append((top, cut))
+        top = cut
+    strips.append((top, height))
+    return strips
+
+
+class OCREngine:
+    """
+    Preprocessing + parallel, cached Tesseract OCR.
+    """
+
+    def __init__(self, workers=None, cache=extraction_cache, lang='eng', config='--psm 6'):
+        """
+        Args:
+            workers (int): Processes for strip OCR (default: CPU count)
+            cache (ExtractionCache): Cache of OCR text (None = off)
+            lang (str): Tesseract language(s), e.g. 'eng' or 'eng+hin'
+            config (str): Extra Tesseract options (psm 6 = uniform text block)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
+        self.lang = lang
+        self.config = config
+
+
+    def ocr(self, source):
+        """
+        OCR an image.
+
+        Args:
+            source: Image bytes or a PIL Image
+
+        Returns:
+            dict with text, seconds, strips (0 on a cache hit),
+            size (original width, height) and cached
+        """
+        return self.ocr_many([source])[0]
+
+
+    def ocr_many(self, sources):
+        """
+        OCR several images (e.g. scanned PDF pages) with one process pool:
+        the strips of every uncached image are spread across the workers.
+
+        Args:
+            sources: List of image bytes or PIL Images
+
+        Returns:
+            List of result dicts (see ocr()), in the same order
+        """
+        kind = f"ocr:{self.lang}:{self.config}"
+        results = [None] * len(sources)
+        pending = []  # (index, image, digest, start, strip count)
+        jobs = []
+
+        for index, source in enumerate(sources):
+            start = time.perf_counter()
+            if isinstance(source, Image.Image):
+                image = source
+                digest = hashlib.sha256(f"{image.mode}{image.size}".encode() + image.tobytes()).hexdigest()
+            else:
+                image = Image.open(io.BytesIO(source))
+                digest = hashlib.sha256(source).hexdigest()
+
+            if self.cache is not None:
+                text = self.cache.get(digest, kind)
+                if text is not None:
+                    results[index] = {"text": text, "seconds": time.perf_counter() - start,
+                                      "strips": 0, "size": image.size, "cached": True}
+                    continue
+
+            prepared = preprocess(image)
+            strips = find_strips(prepared)
+            for top, bottom in strips:
+                part = prepared.crop((0, top, prepared.width, bottom))
+                jobs.append((part.mode, part.size, part.tobytes(), self.lang, self.config))
+            pending.append((index, image, digest, start, len(strips)))
+
+        if not jobs:
+            return results
+
+        workers = min(self.workers, len(jobs))
+        if workers <= 1:
+            texts = [_ocr_strip(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                texts = list(pool.map(_ocr_strip, *zip(*jobs)))
+
+        position = 0
+        for index, image, digest, start, count in pending:
+            parts = texts[position:position + count]
+            position += count
+            text = "\n".join(t.strip() for t in parts if t.strip())
+            seconds = time.perf_counter() - start
+            print(f"   🔍 OCR {image.size[0]}x{image.size[1]}: {count} strip(s), "
+                  f"{workers} worker(s), {seconds:.1f}s")
+
+            if self.cache is not None and text:
+                self.cache.set(digest, kind, text)
+            results[index] = {"text": text, "seconds": seconds, "strips": count,
+                              "size": image.size, "cached": False}
+        return results
@@ -0,0 +1,214 @@
+"""
+PDF Renderer - Styled Diet Plan PDFs
+====================================
+Builds the downloadable report PDF fully in memory (no temp files).
+render_many() renders batches of reports across a process pool.
+render_thumbnails() makes small page previews (needs PyMuPDF).
+"""
+
+import os
+import re
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from fpdf import FPDF
+
+from diet_format import format_diet
+
+try:
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+
+# Cleaning transforms, compiled once
+_HEADING = re.compile(r'^#{1,6}\s*', flags=re.MULTILINE)
+_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_ITALIC = re.compile(r'\*(.+?)\*')
+_PUNCTUATION = str.maketrans({
+    "\u2013": "-", "\u2014": "-",     # en/em dash
+    "\u201c": '"', "\u201d": '"',     # curly double quotes
+    "\u2018": "'", "\u2019": "'",     # curly single quotes
+    "\u2022": "-",                    # bullet
+})
+
+
+def clean_text(text):
+    """Clean text for PDF (strip markdown, keep plain ASCII)."""
+    if not text:
+        return ""
+    text = _HEADING.sub('', text)
+    text = _BOLD.sub(r'\1', text)
+    text = _ITALIC.sub(r'\1', text)
+    text = text.translate(_PUNCTUATION)
+    return text.encode('ascii', 'ignore').decode('ascii').strip()
+
+
+class StyledPDF(FPDF):
+    """Custom PDF with borders and page numbers on ALL pages."""
+    
+    def __init__(self, profile=None):
+        super().__init__()
+        self.profile = profile
+    
+    def header(self):
+        # Draw border on EVERY page (including auto-generated overflow pages)
+        self.set_draw_color(46, 125, 50)  # Green border
+        self.set_line_width(0.5)
+        self.rect(10, 10, 190, 277)  # Full page border
+        
+        # Green header bar
+        self.set_fill_color(46, 125, 50)  # Green
+        self.rect(10, 10, 190, 12, 'F')
+        
+        # Header text
+        self.set_font("Times", "B", 10)
+        self.set_text_color(255, 255, 255)
+        self.set_xy(15, 12)
+        self.cell(0, 8, "AI Diet Recommendation Report", align="L")
+        
+        # Date on right
+        self.set_xy(150, 12)
+        self.cell(0, 8, datetime.now().strftime('%B %d, %Y'), align="L")
+        
+        self.set_text_color(0, 0, 0)
+        self.ln(20)
+    
+    def footer(self):
+        # Position at 15mm from bottom
+        self.set_y(-20)
+        
+        # Green footer bar
+        self.set_fill_color(46, 125, 50)
+        self.rect(10, self.get_y() + 5, 190, 10, 'F')
+        
+        # Page number
+        self.set_font("Times", "I", 9)
+        self.set_text_color(255, 255, 255)
+        self.set_y(-14)
+        self.cell(0, 10, f"Page {self.page_no()}", align="C")
+        
+        self.set_text_color(0, 0, 0)
+    
+    def section_title(self, title):
+        """Add a styled section title."""
+        self.set_font("Times", "B", 14)
+        self.set_fill_color(232, 245, 233)  # Light green
+        self.set_text_color(46, 125, 50)
+        self.cell(0, 10, title, ln=True, fill=True)
+        self.set_text_color(0, 0, 0)
+        self.ln(3)
+    
+    def body_text(self, text):
+        """Add body text."""
+        self.set_font("Times", "", 10)
+        self.multi_cell(0, 5, text)
+        self.ln(5)
+
+
+def generate_pdf(results, profile=None):
+    """Generate styled PDF with borders and page numbers on ALL pages."""
+    pdf = StyledPDF(profile)
+    pdf.set_auto_page_break(auto=True, margin=25)
+    pdf.set_margins(15, 25, 15)
+    
+    # Page 1: Title & Medical Summary
+    pdf.add_page()
+    
+    # Title
+    pdf.set_font("Times", "B", 20)
+    pdf.set_text_color(46, 125, 50)
+    pdf.cell(0, 15, "Your Personalized Diet Plan", ln=True, align="C")
+    pdf.set_text_color(0, 0, 0)
+    
+    # User info
+    if profile:
+        pdf.set_font("Times", "I", 12)
+        pdf.cell(0, 8, f"Prepared for: {profile.get('name', 'User')}", ln=True, align="C")
+        pdf.set_font("Times", "", 10)
+        pdf.cell(0, 6, f"Diet Type: {profile.get('diet_type', 'N/A')} | Goal: {profile.get('weight_goal', 'N/A')}", ln=True, align="C")
+        
+        allergies = profile.get('allergies', [])
+        if allergies:
+            pdf.cell(0, 6, f"Allergies: {', '.join(allergies)}", ln=True, align="C")
+    
+    pdf.ln(10)
+    
+    # Medical Summary
+    pdf.section_title("Medical Summary")
+    pdf.body_text(clean_text(results["translation"]))
+    
+    # Page 2: Diet Recommendations (plain sections from structured data when available)
+    pdf.add_page()
+    pdf.section_title("Diet Recommendations")
+    if results.get("diet_data"):
+        pdf.body_text(clean_text(format_diet(results["diet_data"], markdown=False)))
+    else:
+        pdf.body_text(clean_text(results["diet"]))
+    
+    # Page 3: Meal Plan
+    pdf.add_page()
+    pdf.section_title("7-Day Meal Plan")
+    pdf.body_text(clean_text(results["meal_plan"]))
+    
+    # Final page: Disclaimer
+    pdf.ln(10)
+    pdf.set_font("Times", "I", 9)
+    pdf.set_text_color(128, 128, 128)
+    pdf.multi_cell(0, 5, "Disclaimer: This report is generated by AI and is not medical advice. Always consult a healthcare professional before making dietary changes.")
+    pdf.ln(5)
+    pdf.cell(0, 5, "Generated by AI Diet Recommendation System | Developed by Navya", align="C")
+    
+    # Output straight to memory (fpdf 1.7 returns a latin-1 str for dest='S')
+    return pdf.output(dest='S').encode('latin-1')
+
+
+def render_many(reports, profile=None, workers=None):
+    """
+    Render many reports in a process pool.
+    
+    Only a small window of reports is in flight at once, so memory stays
+    flat however many reports are fed in.
+    
+    Args:
+        reports: Iterable of results dicts (translation, diet, meal_plan[, diet_data])
+        profile: Profile printed on every PDF
+        workers: Number of processes (default: CPU count)
+        
+    Yields:
+        PDF bytes, in the same order as `reports`
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for results in reports:
+            window.append(pool.submit(generate_pdf, results, profile))
+            if len(window) >= workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def render_thumbnails(pdf_bytes, max_pages=4, width=160):
+    """
+    Render low-resolution JPEG thumbnails of the first pages (~5 KB each).
+    
+    Args:
+        pdf_bytes: PDF document
+        max_pages: Pages to render
+        width: Thumbnail width in pixels
+        
+    Returns:
+        (list of JPEG bytes, total page count) - no thumbnails without PyMuPDF
+    """
+    if not PYMUPDF_AVAILABLE:
+        return [], 0
+    
+    thumbnails = []
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc.pages(0, min(max_pages, doc.page_count)):
+            zoom = width / page.rect.width
+            pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom))
+            thumbnails.append(pixmap.tobytes("jpg", jpg_quality=60))
+        return thumbnails, doc.page_count
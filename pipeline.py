@@ -0,0 +1,39 @@
+"""
+Pipeline - Translator -> Recommender -> Meal Planner
+====================================================
+The three-agent chain without any UI. Used by app.py and the
+batch pipeline (batch_pipeline.py).
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agents'))
+
+from agent1_translator import run_agent1
+from agent2_recommender import run_agent2_structured, format_diet
+from agent3_meal_planner import run_agent3
+
+
+def run_pipeline(medical_text, profile=None):
+    """
+    Run all three agents on one medical report.
+
+    Args:
+        medical_text: Raw medical report text
+        profile: User profile dict (defaults to the session profile)
+
+    Returns:
+        dict with translation, diet (markdown), diet_data (structured
+        Agent 2 output) and meal_plan
+    """
+    translation = run_agent1(medical_text, profile)
+    diet_data = run_agent2_structured(translation, profile)
+    diet_rec = format_diet(diet_data)
+    meal_plan = run_agent3(diet_rec, profile)
+
+    return {
+        "translation": translation,
+        "diet": diet_rec,
+        "diet_data": diet_data,
+        "meal_plan": meal_plan
+    }
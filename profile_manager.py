@@ -6,13 +6,20 @@ All agents import from here.
 
 Session-based storage - works on Streamlit Cloud.
 Each user gets their own profile during their session.
+Headless callers (batch pipeline) pass a profile dict to the agents
+directly, so Streamlit is optional here.
 """
 
-import streamlit as st
+try:
+    import streamlit as st
+except ImportError:
+    st = None
 
 
 def get_profile():
     """Get user profile from session state."""
+    if st is None:
+        return None
     if "user_profile" in st.session_state and st.session_state.user_profile:
         return st.session_state.user_profile
     return None
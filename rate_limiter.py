@@ -0,0 +1,199 @@
+"""
+Rate Limiter - Shared Request/Token Budgets per Model
+=====================================================
+Groq limits every model by requests-per-minute (RPM) and
+tokens-per-minute (TPM). All Streamlit sessions live in one process, so a
+single scheduler here keeps them inside those budgets together.
+
+- One token bucket for requests and one for tokens, per model
+- Callers are admitted strictly in arrival order (FIFO, no starvation)
+- The token cost of a call is estimated up front from the prompt size
+  plus max_tokens, and the unused part is refunded once the real usage
+  is known
+- A 429 with Retry-After pauses the whole model, not just one caller
+"""
+
+import time
+import threading
+from collections import deque
+
+
+CHARS_PER_TOKEN = 4        # rough average for English prose
+TOKENS_PER_MESSAGE = 4     # role/formatting overhead per chat message
+
+
+def estimate_tokens(messages, max_tokens=0):
+    """
+    Estimate the TPM cost of a chat call before sending it.
+
+    Args:
+        messages: Chat messages (list of {"role", "content"} dicts)
+        max_tokens: Completion budget requested from the model
+
+    Returns:
+        Estimated prompt + completion tokens
+    """
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    prompt_tokens = prompt_chars // CHARS_PER_TOKEN + TOKENS_PER_MESSAGE * len(messages)
+    return prompt_tokens + (max_tokens or 0)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity`, refills continuously.
+    Not thread-safe on its own - ModelRateLimiter holds the lock.
+    """
+
+    def __init__(self, capacity, per_minute):
+        self.capacity = float(capacity)
+        self.rate = per_minute / 60.0
+        self.level = float(capacity)
+        self.updated = time.monotonic()
+
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` is available (0 if it is now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # oversized calls wait for a full bucket
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+    def give_back(self, amount):
+        self.level = min(self.capacity, self.level + amount)
+
+
+class Admission:
+    """Ticket returned by acquire(); pass it to settle() after the call."""
+
+    def __init__(self, model, tokens, queued):
+        self.model = model
+        self.tokens = tokens        # estimated tokens charged
+        self.queued = queued        # seconds spent waiting for admission
+
+
+class ModelRateLimiter:
+    """
+    RPM + TPM limiter for a single model with FIFO admission.
+    """
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm, rpm)
+        self.tokens = TokenBucket(tpm, tpm)
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._queue = deque()
+
+
+    def acquire(self, tokens):
+        """
+        Block until this caller is first in line and both budgets allow it.
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.monotonic()
+        ticket = object()
+
+        with self._cond:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    if self._queue[0] is not ticket:
+                        self._cond.wait()
+                        continue
+
+                    now = time.monotonic()
+                    wait = max(
+                        self.paused_until - now,
+                        self.requests.wait_time(1, now),
+                        self.tokens.wait_time(tokens, now)
+                    )
+                    if wait <= 0:
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        return time.monotonic() - start
+                    self._cond.wait(wait)
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+
+    def refund(self, tokens):
+        """Return over-estimated tokens to the budget."""
+        if tokens <= 0:
+            return
+        with self._cond:
+            self.tokens.give_back(tokens)
+            self._cond.notify_all()
+
+
+    def pause(self, seconds):
+        """Hold all callers for `seconds` (e.g. after a 429 with Retry-After)."""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RateScheduler:
+    """
+    Process-wide front door for LLM calls, one limiter per model.
+    Models without configured limits are admitted immediately.
+    """
+
+    def __init__(self, limits):
+        """
+        Args:
+            limits: {model_name: {"rpm": int, "tpm": int}}
+        """
+        self._limiters = {
+            model: ModelRateLimiter(l["rpm"], l["tpm"])
+            for model, l in limits.items()
+        }
+
+
+    def acquire(self, model, messages, max_tokens):
+        """Wait for budget for one call. Returns an Admission."""
+        tokens = estimate_tokens(messages, max_tokens)
+        limiter = self._limiters.get(model)
+        queued = limiter.acquire(tokens) if limiter else 0.0
+        return Admission(model, tokens, queued)
+
+
+    def settle(self, admission, used_tokens):
+        """Refund the difference between the estimate and real usage."""
+        limiter = self._limiters.get(admission.model)
+        if limiter and used_tokens is not None:
+            limiter.refund(admission.tokens - used_tokens)
+
+
+    def pause(self, model, seconds):
+        """Back off every caller of `model` for `seconds`."""
+        limiter = self._limiters.get(model)
+        if limiter:
+            limiter.pause(seconds)
+
+
+    def status(self):
+        """Current budget levels per model (for debugging / dashboards)."""
+        now = time.monotonic()
+        status = {}
+        for model, limiter in self._limiters.items():
+            with limiter._cond:
+                limiter.requests._refill(now)
+                limiter.tokens._refill(now)
+                status[model] = {
+                    "requests_available": int(limiter.requests.level),
+                    "tokens_available": int(limiter.tokens.level),
+                    "queued": len(limiter._queue)
+                }
+        return status
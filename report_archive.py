@@ -0,0 +1,226 @@
+"""
+Report Archive - Bulk Export/Import of Report History
+=====================================================
+Moves a whole report history out of or into the report store, one report
+at a time, so memory stays flat however long the history is.
+
+Formats:
+- JSONL: one report per line (the shape of data/reports/report_<id>.json,
+  same as batch_pipeline output)
+- ZIP: reports/report_<id>.json for every report, optionally with
+  pdf/diet_plan_<date>_<id>.pdf next to it (rendered in parallel with
+  pdf_renderer.render_many when workers > 1)
+
+Import reads either format and skips report IDs the store already has,
+so an interrupted import can simply be run again.
+
+Usage:
+    REPORT_STORE=sqlite python -m report_archive export history.zip --pdf --workers 4
+    REPORT_STORE=sqlite python -m report_archive import history.zip
+"""
+
+import os
+import re
+import sys
+import json
+import zipfile
+import argparse
+from collections import deque
+
+from report_manager import iter_reports, get_store
+
+# Fields an imported report must have (the rest are optional)
+REQUIRED_FIELDS = ("report_id", "timestamp", "date")
+
+_ZIP_REPORT_RE = re.compile(r"(?:^|/)report_\d+\.json$")
+
+
+def _pdf_results(report):
+    """pdf_renderer input for a stored report."""
+    return {
+        "translation": report.get("simple_explanation", ""),
+        "diet": report.get("diet_recommendations", ""),
+        "diet_data": report.get("diet_data"),
+        "meal_plan": report.get("meal_plan", "")
+    }
+
+
+def _with_pdfs(reports, profile, workers):
+    """(report, PDF bytes) pairs, the PDFs rendered in a process pool if workers > 1."""
+    from pdf_renderer import generate_pdf, render_many
+
+    if workers <= 1:
+        for report in reports:
+            yield report, generate_pdf(_pdf_results(report), profile)
+        return
+
+    # render_many reads ahead a few reports; keep those until their PDF is back
+    in_flight = deque()
+
+    def feed():
+        for report in reports:
+            in_flight.append(report)
+            yield _pdf_results(report)
+
+    for pdf_bytes in render_many(feed(), profile, workers):
+        yield in_flight.popleft(), pdf_bytes
+
+
+def export_jsonl(out, reports=None):
+    """
+    Write reports as JSONL.
+
+    Args:
+        out: Binary file object
+        reports: Iterable of reports (default: the whole store, newest first)
+
+    Returns:
+        Number of reports written
+    """
+    count = 0
+    for report in (iter_reports() if reports is None else reports):
+        out.write(json.dumps(report, ensure_ascii=False).encode("utf-8") + b"\n")
+        count += 1
+    return count
+
+
+def export_zip(out, reports=None, pdf=False, profile=None, workers=1):
+    """
+    Write reports (and optionally their PDFs) as a ZIP archive.
+
+    Args:
+        out: Binary file object (seekable, e.g. a file or BytesIO)
+        reports: Iterable of reports (default: the whole store, newest first)
+        pdf: Also add a PDF for every report
+        profile: Profile printed on the PDFs
+        workers: Processes for PDF rendering (1 = in this process)
+
+    Returns:
+        Number of reports written
+    """
+    reports = iter_reports() if reports is None else reports
+    pairs = _with_pdfs(reports, profile, workers) if pdf else ((r, None) for r in reports)
+
+    count = 0
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        for report, pdf_bytes in pairs:
+            report_id = report["report_id"]
+            archive.writestr(f"reports/report_{report_id}.json", json.dumps(report, indent=2, ensure_ascii=False))
+            if pdf_bytes is not None:
+                # PDFs are already compressed
+                archive.writestr(f"pdf/diet_plan_{report.get('date', 'report')}_{report_id}.pdf",
+                                 pdf_bytes, compress_type=zipfile.ZIP_STORED)
+            count += 1
+    return count
+
+
+def _iter_jsonl(lines):
+    """Reports from JSONL lines (None for lines that are not JSON)."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def iter_archive(source):
+    """
+    Reports in a JSONL or ZIP export, one at a time.
+
+    Args:
+        source: File path or binary file object
+
+    Yields:
+        report dicts (None for unreadable entries)
+    """
+    if zipfile.is_zipfile(source):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        with zipfile.ZipFile(source) as archive:
+            for name in archive.namelist():
+                if _ZIP_REPORT_RE.search(name):
+                    try:
+                        yield json.loads(archive.read(name))
+                    except ValueError:
+                        yield None
+                elif name.endswith(".jsonl"):
+                    with archive.open(name) as member:
+                        yield from _iter_jsonl(member)
+        return
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+        yield from _iter_jsonl(source)
+    else:
+        with open(source, "rb") as f:
+            yield from _iter_jsonl(f)
+
+
+def import_reports(source, store=None):
+    """
+    Add the reports of a JSONL or ZIP export to the report store.
+
+    Reports keep their report_id; IDs the store already has are skipped,
+    so re-running an interrupted import picks up where it stopped.
+
+    Args:
+        source: File path or binary file object (e.g. a Streamlit upload)
+        store: Report store (default: get_store())
+
+    Returns:
+        dict with imported, skipped and failed counts
+    """
+    store = store or get_store()
+    counts = {"imported": 0, "skipped": 0, "failed": 0}
+    for report in iter_archive(source):
+        if not isinstance(report, dict) or any(field not in report for field in REQUIRED_FIELDS) \
+                or not isinstance(report["report_id"], int):
+            counts["failed"] += 1
+            continue
+        if store.add(report, keep_id=True) is None:
+            counts["skipped"] += 1
+        else:
+            counts["imported"] += 1
+    print(f"📥 Imported {counts['imported']} report(s), skipped {counts['skipped']} existing, "
+          f"{counts['failed']} unreadable")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import report history (JSONL or ZIP).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_parser = sub.add_parser("export", help="Write every report to a .jsonl or .zip file")
+    export_parser.add_argument("output", help="Output file (.jsonl or .zip)")
+    export_parser.add_argument("--pdf", action="store_true", help="ZIP only: add a PDF for every report")
+    export_parser.add_argument("--profile", help="Profile JSON printed on the PDFs")
+    export_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="PDF rendering processes")
+    import_parser = sub.add_parser("import", help="Add the reports of a .jsonl or .zip export")
+    import_parser.add_argument("input", help="Export file (.jsonl or .zip)")
+    args = parser.parse_args(argv)
+
+    if os.getenv("REPORT_STORE", "session").lower() == "session":
+        print("❌ The session store only exists inside the app - set REPORT_STORE=sqlite or REPORT_STORE=files")
+        return 1
+
+    if args.command == "import":
+        import_reports(args.input)
+        return 0
+
+    profile = None
+    if args.profile:
+        with open(args.profile, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    with open(args.output, "wb") as out:
+        if args.output.endswith(".zip"):
+            count = export_zip(out, pdf=args.pdf, profile=profile, workers=args.workers)
+        else:
+            count = export_jsonl(out)
+    print(f"📤 Exported {count} report(s) to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
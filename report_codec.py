@@ -0,0 +1,234 @@
+"""
+Report Codec - Compressed, Deduplicated Report Text
+===================================================
+The text fields of a report (explanation, diet, meal plan, ...) are
+mostly the same markdown over and over: section headings, meal slots,
+shopping-list lines. report_manager stores them as blobs:
+
+- compressed with zstd (if the zstandard package is installed) or zlib,
+  primed with a shared dictionary trained on saved reports
+  (data/dictionaries/report_v<N>.dict)
+- keyed by the SHA-256 of the text, so identical texts are stored once
+  and reference-counted
+
+Every blob starts with a 2-byte header (codec, dictionary version), so
+old blobs still decode after a new dictionary is trained.
+
+Train a new dictionary from data/reports/:
+    python report_codec.py train
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import zlib
+import hashlib
+from collections import Counter
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+
+TEXT_FIELDS = ("medical_text", "simple_explanation", "diet_recommendations", "meal_plan")
+
+DICTIONARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dictionaries")
+# zlib only looks back 32 KB, so a bigger dictionary would not help it
+DICTIONARY_BYTES = 32 * 1024
+# Shorter lines/fragments are not worth a dictionary slot
+MIN_PIECE = 4
+
+# Codec byte of the blob header
+RAW, ZLIB, ZSTD = b"r", b"z", b"s"
+
+# Splits a line into reusable fragments: "- Lunch (12-1 PM): Quinoa Bowl - 1 cup"
+_FRAGMENT_RE = re.compile(r"(?<=[:,])\s+|\s+-\s+|\d+")
+
+_dictionaries = None
+_zstd_dicts = {}
+
+
+def _load_dictionaries():
+    """{version: dictionary bytes} from DICTIONARY_DIR (loaded once)."""
+    global _dictionaries
+    if _dictionaries is None:
+        found = {}
+        for path in glob.glob(os.path.join(DICTIONARY_DIR, "report_v*.dict")):
+            match = re.search(r"report_v(\d+)\.dict$", path)
+            if match:
+                with open(path, "rb") as f:
+                    found[int(match.group(1))] = f.read()
+        _dictionaries = found
+    return _dictionaries
+
+
+def current_version():
+    """Version of the dictionary new blobs use (0 = no dictionary)."""
+    return max(_load_dictionaries(), default=0)
+
+
+def _dictionary(version):
+    if version == 0:
+        return b""
+    try:
+        return _load_dictionaries()[version]
+    except KeyError:
+        raise ValueError(f"Report dictionary v{version} not found in {DICTIONARY_DIR}")
+
+
+def _zstd_dict(version):
+    """ZstdCompressionDict for a dictionary version (built once; None = no dictionary)."""
+    if version not in _zstd_dicts:
+        zdict = _dictionary(version)
+        _zstd_dicts[version] = (
+            zstandard.ZstdCompressionDict(zdict, dict_type=zstandard.DICT_TYPE_RAWCONTENT) if zdict else None
+        )
+    return _zstd_dicts[version]
+
+
+def text_digest(text):
+    """SHA-256 hex digest of a text (the blob key)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode(text):
+    """Compress a text into a blob (header + data)."""
+    raw = text.encode("utf-8")
+    version = current_version()
+
+    if ZSTD_AVAILABLE:
+        codec, data = ZSTD, zstandard.ZstdCompressor(level=19, dict_data=_zstd_dict(version)).compress(raw)
+    else:
+        zdict = _dictionary(version)
+        compressor = zlib.compressobj(9, zdict=zdict) if zdict else zlib.compressobj(9)
+        codec, data = ZLIB, compressor.compress(raw) + compressor.flush()
+
+    if len(data) >= len(raw):  # short texts: compression only adds overhead
+        return RAW + b"\0" + raw
+    return codec + bytes([version]) + data
+
+
+def decode(blob):
+    """Text of a blob made by encode()."""
+    codec, version, data = blob[:1], blob[1], blob[2:]
+    if codec == RAW:
+        return data.decode("utf-8")
+    if codec == ZLIB:
+        zdict = _dictionary(version)
+        decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+        return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+    if codec == ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("Report blob is zstd-compressed - pip install zstandard")
+        return zstandard.ZstdDecompressor(dict_data=_zstd_dict(version)).decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown report blob codec {codec!r}")
+
+
+def pack(report):
+    """
+    Split a report into a slim record and its text blobs.
+
+    Returns:
+        (packed, texts): packed is the report with TEXT_FIELDS replaced
+        by packed["blobs"] = {field: digest}; texts is {digest: text},
+        one entry per distinct text (store each with encode())
+    """
+    packed = {k: v for k, v in report.items() if k not in TEXT_FIELDS}
+    packed["blobs"] = {}
+    texts = {}
+    for field in TEXT_FIELDS:
+        text = report.get(field)
+        if isinstance(text, str):
+            digest = text_digest(text)
+            packed["blobs"][field] = digest
+            texts[digest] = text
+        elif field in report:
+            packed[field] = text  # e.g. None - kept as is
+    return packed, texts
+
+
+def unpack(packed, fetch):
+    """
+    Full report from a packed record.
+
+    Args:
+        packed: Record from pack() (plain reports are returned unchanged)
+        fetch: Function digest -> blob bytes
+
+    Returns:
+        report dict
+    """
+    if "blobs" not in packed:
+        return packed
+    report = {k: v for k, v in packed.items() if k != "blobs"}
+    for field, digest in packed["blobs"].items():
+        report[field] = decode(fetch(digest))
+    return report
+
+
+def _fill(counts, size):
+    """Most frequent (then longest) pieces that fit in size bytes, most frequent last."""
+    chosen = []
+    used = 0
+    for piece in sorted(counts, key=lambda p: (counts[p], len(p)), reverse=True):
+        line = (piece + "\n").encode("utf-8")
+        if used + len(line) <= size:
+            chosen.append(line)
+            used += len(line)
+    return b"".join(reversed(chosen))
+
+
+def train_dictionary(texts, size=DICTIONARY_BYTES):
+    """
+    Build a raw-content dictionary from sample texts.
+
+    Whole lines go first (ranked by how many samples contain them), then
+    fragments seen in at least two samples at the end, where zlib and
+    zstd find them cheapest.
+
+    Returns:
+        bytes (at most size)
+    """
+    line_counts, fragment_counts = Counter(), Counter()
+    for text in texts:
+        lines = {line.strip() for line in text.splitlines() if len(line.strip()) >= MIN_PIECE}
+        line_counts.update(lines)
+        fragment_counts.update({
+            fragment.strip() for line in lines for fragment in _FRAGMENT_RE.split(line)
+            if len(fragment.strip()) >= MIN_PIECE
+        })
+    fragments = _fill({f: c for f, c in fragment_counts.items() if c >= 2}, size // 4)
+    return _fill(line_counts, size - len(fragments)) + fragments
+
+
+def report_texts(paths):
+    """All TEXT_FIELDS of the report JSON files at paths."""
+    texts = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        texts += [report[field] for field in TEXT_FIELDS if isinstance(report.get(field), str)]
+    return texts
+
+
+def main():
+    if sys.argv[1:] != ["train"]:
+        print(__doc__)
+        return
+    reports_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reports")
+    paths = sorted(glob.glob(os.path.join(reports_dir, "report_*.json")))
+    dictionary = train_dictionary(report_texts(paths))
+
+    version = current_version() + 1
+    os.makedirs(DICTIONARY_DIR, exist_ok=True)
+    path = os.path.join(DICTIONARY_DIR, f"report_v{version}.dict")
+    with open(path, "wb") as f:
+        f.write(dictionary)
+    print(f"✅ Trained on {len(paths)} report(s): {path} ({len(dictionary)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
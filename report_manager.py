@@ -3,14 +3,104 @@ Report Manager - Store and Load Generated Reports
 ==================================================
 Saves all generated diet plans for dashboard history.
 
-Session-based storage - works on Streamlit Cloud.
-Each user gets their own reports during their session.
+Pluggable storage, picked with the REPORT_STORE environment variable:
+- "session" (default): reports live in st.session_state - works on
+  Streamlit Cloud, each user gets their own reports during their session
+- "sqlite": reports persist in a SQLite file (REPORT_DB_PATH, default
+  data/reports.sqlite) shared by every session - for self-hosted,
+  single-user installs
+- "files": one JSON file per report in data/reports/ (REPORTS_DIR), plus
+  any batch_pipeline JSONL output dropped there; listing and stats read a
+  sidecar index, report files are only parsed when opened
+
+The session and SQLite stores keep the report texts compressed and deduplicated (report_codec.py);
+load_reports() and get_report() return them decompressed.
+
+build_report() and extract_conditions() also work without Streamlit
+(used by the batch pipeline).
 """
 
-import streamlit as st
+try:
+    import streamlit as st
+except ImportError:
+    st = None
+import os
+import re
+import json
 import time
+import bisect
+import sqlite3
+import threading
 from datetime import datetime
 
+from report_codec import pack, unpack, encode
+
+_id_lock = threading.Lock()
+_last_report_id = 0
+
+CONDITION_KEYWORDS = {
+    "Diabetes": ["diabetes", "blood sugar", "glucose", "hba1c", "hyperglycemia", "insulin"],
+    "High Cholesterol": ["cholesterol", "ldl", "hdl", "triglycerides", "lipid"],
+    "Hypertension": ["hypertension", "blood pressure", "bp", "high pressure"],
+    "Anemia": ["anemia", "iron", "hemoglobin", "ferritin", "low iron"],
+    "Thyroid": ["thyroid", "tsh", "t3", "t4", "hypothyroid", "hyperthyroid"],
+    "Kidney": ["kidney", "creatinine", "urea", "renal", "gfr"],
+    "Liver": ["liver", "alt", "ast", "bilirubin", "hepatic"],
+    "Vitamin D Deficiency": ["vitamin d", "vit d", "25-oh"],
+    "Vitamin B12 Deficiency": ["vitamin b12", "b12", "cobalamin"],
+    "Obesity": ["obesity", "bmi", "overweight", "weight loss"],
+    "Heart Disease": ["heart", "cardiac", "cardiovascular", "coronary"],
+    "PCOS": ["pcos", "polycystic", "ovarian"],
+    "Uric Acid": ["uric acid", "gout", "urate"]
+}
+
+# Direct negation cues: right before the keyword ("no diabetes", "negative
+# for anemia", "free of thyroid disease") or right after it ("anemia ruled
+# out"). A bare "not" is no cue: "not enough iron" and "you do not have
+# enough vitamin B12" are findings, as in translator_rules. Since the cue
+# must touch the keyword, "no doubt your cholesterol is high" and "no
+# sugar drinks help glucose control" still count.
+NEGATIONS = ["no", "without", "denies", "denied", "negative for", "free of", "ruled out", "absence of"]
+NEGATIONS_AFTER = ["ruled out", "negative", "absent"]
+
+# Built once at import: (condition, keywords longest first). Matching uses
+# str.find plus word-boundary checks - in CPython this beat both a single
+# alternation regex and per-keyword regexes on the saved reports
+# (benchmarks/bench_conditions.py).
+_CONDITION_TABLE = [
+    (condition, tuple(sorted(keywords, key=len, reverse=True)))
+    for condition, keywords in CONDITION_KEYWORDS.items()
+]
+_NEGATION_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(n) for n in NEGATIONS) + r")"
+    r"(?:\s+(?:signs?|evidence|history|symptoms?)\s+of|\s+known)?\s+$"
+)
+_NEGATION_AFTER_RE = re.compile(
+    r"^\s+(?:is\s+|was\s+|has been\s+)?(?:" + "|".join(re.escape(n) for n in NEGATIONS_AFTER) + r")\b"
+)
+
+
+def _next_report_id():
+    """Unique, increasing report ID (seconds since epoch, bumped on collision)."""
+    global _last_report_id
+    with _id_lock:
+        _last_report_id = max(int(time.time()), _last_report_id + 1)
+        return _last_report_id
+
+
+REPORT_DB_PATH = os.getenv(
+    "REPORT_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reports.sqlite")
+)
+
+
+REPORTS_DIR = os.getenv(
+    "REPORTS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reports")
+)
+REPORT_INDEX_NAME = ".report_index.jsonl"
+_REPORT_FILE_RE = re.compile(r"report_\d+\.json$")
+
 
 def _get_reports_list():
     """Get reports list from session state."""
@@ -19,9 +109,686 @@ def _get_reports_list():
     return st.session_state.reports
 
 
-def save_report(medical_text, translation, diet_rec, meal_plan, pdf_path=None):
+def _get_blobs():
+    """Compressed report texts in session state: {digest: [blob, refs]}."""
+    if "report_blobs" not in st.session_state:
+        st.session_state.report_blobs = {}
+    return st.session_state.report_blobs
+
+
+def _fetch_blob(digest):
+    return _get_blobs()[digest][0]
+
+
+def _stats_from_counters(version, total, condition_counts, date_counts):
+    """get_stats() dict from the maintained counters."""
+    most_common = max(condition_counts, key=condition_counts.get) if condition_counts else "None"
+    return {
+        "total_reports": total,
+        "conditions": list(condition_counts),
+        "condition_counts": dict(condition_counts),
+        "most_common_condition": most_common,
+        "first_report_date": min(date_counts) if date_counts else None,
+        "last_report_date": max(date_counts) if date_counts else None,
+        "version": version
+    }
+
+
+def _summary(report):
+    """Light history entry for a report (what the Dashboard list shows)."""
+    return {
+        "report_id": report.get("report_id"),
+        "date": report.get("date"),
+        "time": report.get("time", ""),
+        "conditions_found": report.get("conditions_found", [])
+    }
+
+
+def _bump(counts, key, step):
+    """Add step to counts[key], dropping keys that reach zero."""
+    count = counts.get(key, 0) + step
+    if count > 0:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
+
+
+class SessionReportStore:
+    """
+    Reports in st.session_state (newest first), one list per session.
+    The list holds packed reports; their texts are blobs in
+    st.session_state.report_blobs, shared between reports.
+    
+    Stats counters live next to the list (st.session_state.report_stats)
+    and are updated by add()/delete(), so stats() never walks the reports.
+    """
+
+    def add(self, report, keep_id=False):
+        """
+        Store a report; returns its (possibly bumped) report_id.
+        
+        keep_id=True (imports): store it under its own report_id, or
+        return None if that ID is already taken.
+        """
+        reports = _get_reports_list()
+        if keep_id:
+            if self._find(report["report_id"]) is not None:
+                return None
+        elif reports:
+            # Stay the newest even after importing IDs from the future
+            report["report_id"] = max(report["report_id"], reports[0]["report_id"] + 1)
+        self._counters()  # build from the current list before it changes
+        packed, texts = pack(report)
+        blobs = _get_blobs()
+        for digest, text in texts.items():
+            if digest in blobs:
+                blobs[digest][1] += 1
+            else:
+                blobs[digest] = [encode(text), 1]
+        if keep_id:
+            bisect.insort(reports, packed, key=lambda r: -r["report_id"])
+        else:
+            reports.insert(0, packed)  # Add to beginning (newest first)
+        st.session_state.reports = reports
+        self._count(packed, 1)
+        return report["report_id"]
+
+
+    def list(self):
+        """All reports, newest first."""
+        return [unpack(r, _fetch_blob) for r in _get_reports_list()]
+
+
+    def page(self, limit, before_id=None):
+        """Summaries of up to `limit` reports with report_id < before_id, newest first."""
+        reports = _get_reports_list()
+        start = 0
+        if before_id is not None:
+            # IDs are decreasing along the list: binary search on -report_id
+            start = bisect.bisect_right(reports, -before_id, key=lambda r: -r["report_id"])
+        return [_summary(r) for r in reports[start:start + limit]]
+
+
+    def get(self, report_id):
+        """One report by ID, or None."""
+        packed = self._find(report_id)
+        return unpack(packed, _fetch_blob) if packed is not None else None
+
+
+    def delete(self, report_id):
+        """Delete a report by ID (and the blobs no other report uses)."""
+        self._counters()
+        packed = self._find(report_id)
+        if packed is not None:
+            st.session_state.reports = [r for r in _get_reports_list() if r.get("report_id") != report_id]
+            blobs = _get_blobs()
+            # add() counted each distinct text once, even if several fields share it
+            for digest in set(packed.get("blobs", {}).values()):
+                blobs[digest][1] -= 1
+                if blobs[digest][1] <= 0:
+                    del blobs[digest]
+            self._count(packed, -1)
+        return True
+
+
+    def _find(self, report_id):
+        reports = _get_reports_list()
+        i = bisect.bisect_left(reports, -report_id, key=lambda r: -r["report_id"])
+        if i < len(reports) and reports[i]["report_id"] == report_id:
+            return reports[i]
+        return None
+
+
+    def stats(self):
+        """Dashboard statistics (see get_stats), from the counters."""
+        counters = self._counters()
+        return _stats_from_counters(
+            counters["version"], counters["total"], counters["condition_counts"], counters["date_counts"]
+        )
+
+
+    def _counters(self):
+        """Session counters, built once from the list if missing."""
+        if "report_stats" not in st.session_state:
+            st.session_state.report_stats = {"version": 0, "total": 0, "condition_counts": {}, "date_counts": {}}
+            for report in _get_reports_list():
+                self._count(report, 1)
+        return st.session_state.report_stats
+
+
+    def _count(self, report, step):
+        counters = self._counters()
+        counters["total"] += step
+        for condition in report.get("conditions_found", []):
+            _bump(counters["condition_counts"], condition, step)
+        _bump(counters["date_counts"], report.get("date"), step)
+        counters["version"] += 1
+
+
+class SQLiteReportStore:
     """
-    Save a generated report to session state.
+    Reports in a SQLite file (WAL mode), shared by all sessions.
+    
+    - reports: one row per report, the packed report (report_codec.pack)
+      as JSON in `body` and the history-list fields (_summary) as JSON
+      in `summary`
+    - report_blobs: compressed report texts by digest, reference-counted;
+      a trigger releases a report's blobs when it is deleted
+    - report_conditions: (condition, report_id) pairs
+    - indexes on date and condition keep history and stats queries
+      off full-table scans
+    - condition_counts / date_counts / store_meta.version are kept up to
+      date by triggers in the same transaction as every insert/delete,
+      so stats() reads a few small rows
+    
+    IDs are unique and increasing even across processes: add() takes
+    max(report_id, largest stored id + 1) inside a write transaction.
+    Safe to share between Streamlit script threads (one connection + lock).
+    """
+
+    def __init__(self, path=REPORT_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS reports (
+                report_id INTEGER PRIMARY KEY,
+                timestamp REAL NOT NULL,
+                date TEXT NOT NULL,
+                body TEXT NOT NULL,
+                summary TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_reports_date ON reports(date);
+            CREATE TABLE IF NOT EXISTS report_conditions (
+                condition TEXT NOT NULL,
+                report_id INTEGER NOT NULL REFERENCES reports(report_id) ON DELETE CASCADE,
+                PRIMARY KEY (condition, report_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_report_conditions_report ON report_conditions(report_id);
+            
+            CREATE TABLE IF NOT EXISTS report_blobs (
+                digest TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                refs INTEGER NOT NULL
+            );
+            CREATE TRIGGER IF NOT EXISTS reports_released AFTER DELETE ON reports BEGIN
+                UPDATE report_blobs SET refs = refs - 1
+                    WHERE digest IN (SELECT value FROM json_each(OLD.body, '$.blobs'));
+                DELETE FROM report_blobs
+                    WHERE refs <= 0 AND digest IN (SELECT value FROM json_each(OLD.body, '$.blobs'));
+            END;
+            
+            CREATE TABLE IF NOT EXISTS condition_counts (condition TEXT PRIMARY KEY, count INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS date_counts (date TEXT PRIMARY KEY, count INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            
+            CREATE TRIGGER IF NOT EXISTS reports_counted AFTER INSERT ON reports BEGIN
+                INSERT INTO date_counts (date, count) VALUES (NEW.date, 1)
+                    ON CONFLICT(date) DO UPDATE SET count = count + 1;
+                UPDATE store_meta SET value = value + 1 WHERE key = 'version';
+            END;
+            CREATE TRIGGER IF NOT EXISTS reports_uncounted AFTER DELETE ON reports BEGIN
+                UPDATE date_counts SET count = count - 1 WHERE date = OLD.date;
+                DELETE FROM date_counts WHERE date = OLD.date AND count <= 0;
+                UPDATE store_meta SET value = value + 1 WHERE key = 'version';
+            END;
+            CREATE TRIGGER IF NOT EXISTS conditions_counted AFTER INSERT ON report_conditions BEGIN
+                INSERT INTO condition_counts (condition, count) VALUES (NEW.condition, 1)
+                    ON CONFLICT(condition) DO UPDATE SET count = count + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS conditions_uncounted AFTER DELETE ON report_conditions BEGIN
+                UPDATE condition_counts SET count = count - 1 WHERE condition = OLD.condition;
+                DELETE FROM condition_counts WHERE condition = OLD.condition AND count <= 0;
+            END;
+        """)
+        self._stats_cache = (None, None)  # (version, stats)
+        self._backfill_counters()
+        self._backfill_summaries()
+
+
+    def _backfill_counters(self):
+        """Fill the counter tables once for databases created before they existed."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT 1 FROM store_meta WHERE key = 'version'").fetchone() is None:
+                    for statement in (
+                        "DELETE FROM condition_counts",
+                        "DELETE FROM date_counts",
+                        "INSERT INTO condition_counts SELECT condition, COUNT(*) FROM report_conditions GROUP BY condition",
+                        "INSERT INTO date_counts SELECT date, COUNT(*) FROM reports GROUP BY date",
+                        "INSERT INTO store_meta (key, value) VALUES ('version', 0)"
+                    ):
+                        self._conn.execute(statement)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+    def _backfill_summaries(self):
+        """Add and fill the summary column for databases created before it existed."""
+        with self._lock:
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(reports)")]
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if "summary" not in columns:
+                    self._conn.execute("ALTER TABLE reports ADD COLUMN summary TEXT")
+                rows = self._conn.execute("SELECT report_id, body FROM reports WHERE summary IS NULL").fetchall()
+                self._conn.executemany(
+                    "UPDATE reports SET summary = ? WHERE report_id = ?",
+                    [(json.dumps(_summary(json.loads(body))), report_id) for report_id, body in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+    def add(self, report, keep_id=False):
+        """
+        Store a report; returns its (possibly bumped) report_id.
+        
+        keep_id=True (imports): store it under its own report_id, or
+        return None if that ID is already taken.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if keep_id:
+                    if self._conn.execute(
+                        "SELECT 1 FROM reports WHERE report_id = ?", (report["report_id"],)
+                    ).fetchone():
+                        self._conn.execute("ROLLBACK")
+                        return None
+                else:
+                    (last_id,) = self._conn.execute("SELECT COALESCE(MAX(report_id), 0) FROM reports").fetchone()
+                    report["report_id"] = max(report["report_id"], last_id + 1)
+                packed, texts = pack(report)
+                for digest, text in texts.items():
+                    if not self._conn.execute(
+                        "UPDATE report_blobs SET refs = refs + 1 WHERE digest = ?", (digest,)
+                    ).rowcount:
+                        self._conn.execute(
+                            "INSERT INTO report_blobs (digest, data, refs) VALUES (?, ?, 1)", (digest, encode(text))
+                        )
+                self._conn.execute(
+                    "INSERT INTO reports (report_id, timestamp, date, body, summary) VALUES (?, ?, ?, ?, ?)",
+                    (report["report_id"], report["timestamp"], report["date"],
+                     json.dumps(packed), json.dumps(_summary(report)))
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO report_conditions (condition, report_id) VALUES (?, ?)",
+                    [(c, report["report_id"]) for c in report.get("conditions_found", [])]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return report["report_id"]
+
+
+    def list(self):
+        """All reports, newest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT body FROM reports ORDER BY report_id DESC").fetchall()
+            return [unpack(json.loads(body), self._fetch_blob) for (body,) in rows]
+
+
+    def page(self, limit, before_id=None):
+        """Summaries of up to `limit` reports with report_id < before_id, newest first (primary key range scan)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT summary FROM reports WHERE report_id < ? ORDER BY report_id DESC LIMIT ?",
+                (before_id if before_id is not None else 2 ** 63 - 1, limit)
+            ).fetchall()
+        return [json.loads(summary) for (summary,) in rows]
+
+
+    def get(self, report_id):
+        """One report by ID, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM reports WHERE report_id = ?", (report_id,)).fetchone()
+            return unpack(json.loads(row[0]), self._fetch_blob) if row else None
+
+
+    def _fetch_blob(self, digest):
+        """Blob bytes by digest (call with the lock held)."""
+        return self._conn.execute("SELECT data FROM report_blobs WHERE digest = ?", (digest,)).fetchone()[0]
+
+
+    def delete(self, report_id):
+        """Delete a report (its condition rows and unshared blobs) by ID."""
+        with self._lock:
+            self._conn.execute("DELETE FROM reports WHERE report_id = ?", (report_id,))
+        return True
+
+
+    def stats(self):
+        """Dashboard statistics (see get_stats), from the counter tables."""
+        with self._lock:
+            (version,) = self._conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()
+            if self._stats_cache[0] == version:
+                return self._stats_cache[1]
+            condition_counts = dict(self._conn.execute("SELECT condition, count FROM condition_counts").fetchall())
+            date_counts = dict(self._conn.execute("SELECT date, count FROM date_counts").fetchall())
+            stats = _stats_from_counters(version, sum(date_counts.values()), condition_counts, date_counts)
+            self._stats_cache = (version, stats)
+        return stats
+
+
+def _indexable(report):
+    return isinstance(report, dict) and isinstance(report.get("report_id"), int)
+
+
+class FileReportStore:
+    """
+    Reports as files in a directory (data/reports/report_<id>.json, the
+    format the app has always written), read through a sidecar index.
+    
+    The index (REPORT_INDEX_NAME, JSONL, append-only) holds one line per
+    report - report_id, date, time, conditions_found, file, byte offset
+    and size - and the mtime/size each file had when it was indexed.
+    page() and stats() only use the index (kept in memory); get() seeks
+    to the report's bytes and parses just that document.
+    
+    Files are picked up incrementally: when the directory changes, only
+    new or modified files are parsed, and JSONL files (batch_pipeline
+    output) are read from where the last scan stopped. Deletes append a
+    record; the index is rewritten once stale lines dominate.
+    """
+
+    def __init__(self, directory=REPORTS_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.index_path = os.path.join(directory, REPORT_INDEX_NAME)
+        self._lock = threading.Lock()
+        self._entries = {}   # report_id -> index entry
+        self._ids = []       # sorted report_ids
+        self._files = {}     # file name -> {"mtime", "size"} when indexed
+        self._jsonl = set()  # names of indexed JSONL files
+        self._deleted = set()  # report_ids deleted from JSONL files
+        self._counters = {"version": 0, "total": 0, "condition_counts": {}, "date_counts": {}}
+        self._dir_mtime = None
+        self._load_index()
+
+
+    def _load_index(self):
+        """Replay the index file, compacting it if it is mostly stale."""
+        lines = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        continue  # torn last line
+                    lines += 1
+        if lines > 2 * (len(self._entries) + len(self._files)) + 100:
+            self._rewrite_index()
+
+
+    def _rewrite_index(self):
+        records = [{"file": name, **state} for name, state in self._files.items()]
+        records += [{"report_id": i, "deleted": True} for i in sorted(self._deleted)]
+        records += [self._entries[i] for i in self._ids]
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+        os.replace(temp_path, self.index_path)
+
+
+    def _record(self, records):
+        """Apply index records and append them to the index file."""
+        for record in records:
+            self._apply(record)
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(r) + "\n" for r in records)
+
+
+    def _apply(self, record):
+        """One index record: a file state, a file drop, a delete, a restore or a report entry."""
+        if "report_id" not in record:
+            if record.get("drop"):
+                for report_id in [i for i, e in self._entries.items() if e["file"] == record["file"]]:
+                    self._remove(report_id)
+                self._files.pop(record["file"], None)
+                self._jsonl.discard(record["file"])
+            else:
+                self._files[record["file"]] = {"mtime": record["mtime"], "size": record["size"]}
+                if record["file"].endswith(".jsonl"):
+                    self._jsonl.add(record["file"])
+        elif record.get("deleted"):
+            self._deleted.add(record["report_id"])
+            self._remove(record["report_id"])
+        elif record.get("restored"):
+            self._deleted.discard(record["report_id"])  # the ID was stored again (e.g. re-imported)
+        elif record["report_id"] not in self._entries and record["report_id"] not in self._deleted:
+            self._entries[record["report_id"]] = record
+            bisect.insort(self._ids, record["report_id"])
+            self._count(record, 1)
+
+
+    def _remove(self, report_id):
+        entry = self._entries.pop(report_id, None)
+        if entry is not None:
+            del self._ids[bisect.bisect_left(self._ids, report_id)]
+            self._count(entry, -1)
+
+
+    def _count(self, entry, step):
+        self._counters["total"] += step
+        for condition in entry.get("conditions_found", []):
+            _bump(self._counters["condition_counts"], condition, step)
+        _bump(self._counters["date_counts"], entry.get("date"), step)
+        self._counters["version"] += 1
+
+
+    def _refresh(self):
+        """Index new/changed files since the last look (call with the lock held)."""
+        dir_mtime = os.stat(self.directory).st_mtime_ns
+        if dir_mtime == self._dir_mtime:
+            # Appending to a file does not touch the directory: check the JSONL files
+            records = []
+            for name in list(self._jsonl):
+                state = self._files[name]
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime_ns == state["mtime"]:
+                    continue
+                if stat.st_size >= state["size"]:
+                    records += self._scan_file(name, state["size"], stat.st_mtime_ns)
+                else:  # rewritten
+                    records.append({"file": name, "drop": True})
+                    records += self._scan_file(name, 0, stat.st_mtime_ns)
+            if records:
+                self._record(records)
+            return
+        self._dir_mtime = dir_mtime
+
+        records = []
+        present = set()
+        for item in os.scandir(self.directory):
+            name = item.name
+            if not (_REPORT_FILE_RE.match(name) or (name.endswith(".jsonl") and not name.startswith("."))):
+                continue
+            present.add(name)
+            stat = item.stat()
+            state = self._files.get(name)
+            if state and state["mtime"] == stat.st_mtime_ns and state["size"] == stat.st_size:
+                continue
+            if name.endswith(".jsonl") and state and stat.st_size >= state["size"]:
+                start = state["size"]  # appended to: read only the new lines
+            else:
+                start = 0
+                if state:
+                    records.append({"file": name, "drop": True})
+            records += self._scan_file(name, start, stat.st_mtime_ns)
+        records += [{"file": name, "drop": True} for name in set(self._files) - present]
+        if records:
+            self._record(records)
+
+
+    def _scan_file(self, name, start, mtime):
+        """Index records for the reports in a file, from byte offset start."""
+        path = os.path.join(self.directory, name)
+        records = []
+        with open(path, "rb") as f:
+            if name.endswith(".jsonl"):
+                f.seek(start)
+                offset = start
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # still being written - picked up next time
+                    try:
+                        report = json.loads(line)
+                    except ValueError:
+                        report = None
+                    if _indexable(report):
+                        records.append({**_summary(report), "file": name, "offset": offset, "size": len(line)})
+                    offset += len(line)
+                end = offset
+            else:
+                data = f.read()
+                end = len(data)
+                try:
+                    report = json.loads(data)
+                except ValueError:
+                    report = None
+                if _indexable(report):
+                    records.append({**_summary(report), "file": name, "offset": 0, "size": end})
+                else:
+                    print(f"⚠️ Skipping unreadable report file {name}")
+        records.append({"file": name, "mtime": mtime, "size": end})
+        return records
+
+
+    def _read(self, entry):
+        """Parse one report from its file (call with the lock held)."""
+        try:
+            with open(os.path.join(self.directory, entry["file"]), "rb") as f:
+                f.seek(entry["offset"])
+                return json.loads(f.read(entry["size"]))
+        except (OSError, ValueError):
+            return None
+
+
+    def add(self, report, keep_id=False):
+        """
+        Write report_<id>.json; returns its (possibly bumped) report_id.
+        
+        keep_id=True (imports): store it under its own report_id, or
+        return None if that ID is already taken. An ID deleted from a
+        JSONL file is free again.
+        """
+        with self._lock:
+            self._refresh()
+            if keep_id:
+                if report["report_id"] in self._entries:
+                    return None
+            else:
+                report["report_id"] = max(report["report_id"], (self._ids[-1] + 1) if self._ids else 0)
+            name = f"report_{report['report_id']}.json"
+            path = os.path.join(self.directory, name)
+            data = json.dumps(report, indent=2, ensure_ascii=False).encode("utf-8")
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            mtime = os.stat(path).st_mtime_ns
+            records = []
+            if report["report_id"] in self._deleted:
+                records.append({"report_id": report["report_id"], "restored": True})
+            self._record(records + [
+                {**_summary(report), "file": name, "offset": 0, "size": len(data)},
+                {"file": name, "mtime": mtime, "size": len(data)}
+            ])
+        return report["report_id"]
+
+
+    def list(self):
+        """All reports, newest first (parses every file - prefer page())."""
+        with self._lock:
+            self._refresh()
+            reports = [self._read(self._entries[i]) for i in reversed(self._ids)]
+        return [r for r in reports if r is not None]
+
+
+    def page(self, limit, before_id=None):
+        """Summaries of up to `limit` reports with report_id < before_id, newest first (index only)."""
+        with self._lock:
+            self._refresh()
+            end = len(self._ids) if before_id is None else bisect.bisect_left(self._ids, before_id)
+            ids = self._ids[max(0, end - limit):end]
+            return [_summary(self._entries[i]) for i in reversed(ids)]
+
+
+    def get(self, report_id):
+        """One report by ID, or None."""
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(report_id)
+            return self._read(entry) if entry else None
+
+
+    def delete(self, report_id):
+        """Delete a report: its file, or (inside a JSONL file) hide it via the index."""
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(report_id)
+            if entry is None:
+                return True
+            if entry["file"].endswith(".jsonl"):
+                self._record([{"report_id": report_id, "deleted": True}])
+            else:
+                try:
+                    os.remove(os.path.join(self.directory, entry["file"]))
+                except FileNotFoundError:
+                    pass
+                self._record([{"file": entry["file"], "drop": True}])
+        return True
+
+
+    def stats(self):
+        """Dashboard statistics (see get_stats), from the index."""
+        with self._lock:
+            self._refresh()
+            c = self._counters
+            return _stats_from_counters(c["version"], c["total"], c["condition_counts"], c["date_counts"])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The report store selected by REPORT_STORE ("session", "sqlite" or "files")."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            kind = os.getenv("REPORT_STORE", "session").lower()
+            if kind == "sqlite":
+                _store = SQLiteReportStore()
+            elif kind == "files":
+                _store = FileReportStore()
+            elif kind == "session":
+                _store = SessionReportStore()
+            else:
+                raise ValueError(f"Unknown REPORT_STORE '{kind}' (use 'session', 'sqlite' or 'files')")
+        return _store
+
+
+def build_report(medical_text, translation, diet_rec, meal_plan, pdf_path=None, diet_data=None):
+    """
+    Build a report record (same shape as data/reports/report_<id>.json).
     
     Args:
         medical_text: Original medical report text
@@ -29,137 +796,185 @@ def save_report(medical_text, translation, diet_rec, meal_plan, pdf_path=None):
         diet_rec: Agent 2 output
         meal_plan: Agent 3 output
         pdf_path: Path to generated PDF (optional)
+        diet_data: Structured Agent 2 output (optional)
         
     Returns:
-        report_id: Unique ID of saved report
+        report dict
     """
-    report_id = int(time.time())
-    
-    # Extract conditions from translation
-    conditions = extract_conditions(translation + " " + diet_rec)
+    # Extract conditions from translation (+ the diet's rationale, not its food lists)
+    if diet_data:
+        conditions = extract_conditions(" ".join([
+            translation,
+            diet_data.get("diet_name", ""),
+            diet_data.get("why", ""),
+            " ".join(diet_data.get("nutrients", []))
+        ]))
+    else:
+        conditions = extract_conditions(translation + " " + diet_rec)
     
-    report = {
-        "report_id": report_id,
+    now = datetime.now()
+    return {
+        "report_id": _next_report_id(),
         "timestamp": time.time(),
-        "date": datetime.now().strftime("%Y-%m-%d"),
-        "time": datetime.now().strftime("%H:%M"),
+        "date": now.strftime("%Y-%m-%d"),
+        "time": now.strftime("%H:%M"),
         "medical_text": medical_text[:500] + "..." if len(medical_text) > 500 else medical_text,
         "simple_explanation": translation,
         "diet_recommendations": diet_rec,
         "meal_plan": meal_plan,
         "conditions_found": conditions,
-        "pdf_path": pdf_path
+        "pdf_path": pdf_path,
+        "diet_data": diet_data
     }
+
+
+def save_report(medical_text, translation, diet_rec, meal_plan, pdf_path=None, diet_data=None):
+    """
+    Save a generated report to the report store.
     
-    reports = _get_reports_list()
-    reports.insert(0, report)  # Add to beginning (newest first)
-    st.session_state.reports = reports
-    
-    return report_id
+    Args:
+        medical_text: Original medical report text
+        translation: Agent 1 output
+        diet_rec: Agent 2 output
+        meal_plan: Agent 3 output
+        pdf_path: Path to generated PDF (optional)
+        diet_data: Structured Agent 2 output (optional)
+        
+    Returns:
+        report_id: Unique ID of saved report
+    """
+    report = build_report(medical_text, translation, diet_rec, meal_plan, pdf_path, diet_data)
+    return get_store().add(report)
 
 
 def load_reports():
     """
-    Load all saved reports from session state.
+    Load all saved reports.
     
     Returns:
         List of reports sorted by date (newest first)
     """
-    return _get_reports_list()
+    return get_store().list()
+
+
+def list_reports(limit=10, before_id=None):
+    """
+    One page of the report history, without the report texts.
+    
+    Args:
+        limit: Reports per page
+        before_id: Cursor - only reports older than this report_id
+                   (None = start from the newest)
+        
+    Returns:
+        (summaries, next_before_id): summaries are dicts with report_id,
+        date, time and conditions_found (newest first); next_before_id is
+        the cursor for the next page, or None on the last page. Use
+        get_report() for the full report.
+    """
+    summaries = get_store().page(limit + 1, before_id)
+    if len(summaries) > limit:
+        return summaries[:limit], summaries[limit - 1]["report_id"]
+    return summaries, None
+
+
+def iter_reports(page_size=100):
+    """
+    Every report, newest first, one at a time (fetched page by page, so
+    memory stays flat however many reports are stored).
+    
+    Yields:
+        report dicts
+    """
+    before_id = None
+    while True:
+        summaries, before_id = list_reports(page_size, before_id)
+        for summary in summaries:
+            report = get_report(summary["report_id"])
+            if report is not None:
+                yield report
+        if before_id is None:
+            return
 
 
 def get_report(report_id):
     """Get a specific report by ID."""
-    reports = _get_reports_list()
-    for report in reports:
-        if report.get("report_id") == report_id:
-            return report
-    return None
+    return get_store().get(report_id)
 
 
 def delete_report(report_id):
     """Delete a report by ID."""
-    reports = _get_reports_list()
-    st.session_state.reports = [r for r in reports if r.get("report_id") != report_id]
-    return True
+    return get_store().delete(report_id)
 
 
 def get_stats():
     """
     Get dashboard statistics.
     
+    Maintained incrementally by save_report/delete_report; "version"
+    changes on every save/delete (use it as a cache key).
+    
     Returns:
         dict with stats
     """
-    reports = _get_reports_list()
-    
-    if not reports:
-        return {
-            "total_reports": 0,
-            "conditions": [],
-            "condition_counts": {},
-            "most_common_condition": "None",
-            "first_report_date": None,
-            "last_report_date": None
-        }
-    
-    # Count conditions
-    all_conditions = []
-    for r in reports:
-        all_conditions.extend(r.get("conditions_found", []))
-    
-    # Find most common
-    condition_counts = {}
-    for c in all_conditions:
-        condition_counts[c] = condition_counts.get(c, 0) + 1
-    
-    most_common = max(condition_counts, key=condition_counts.get) if condition_counts else "None"
-    
-    return {
-        "total_reports": len(reports),
-        "conditions": list(set(all_conditions)),
-        "condition_counts": condition_counts,
-        "most_common_condition": most_common,
-        "first_report_date": reports[-1].get("date") if reports else None,
-        "last_report_date": reports[0].get("date") if reports else None
-    }
+    return get_store().stats()
 
 
 def extract_conditions(text):
     """
     Extract health conditions from text using keyword matching.
     
+    Keywords only match whole words ("bp" not inside "bpm", optional
+    plural "s"), and mentions right after or before a negation cue
+    ("no diabetes", "negative for anemia", "anemia ruled out") are
+    ignored.
+    
     Args:
         text: Text to analyze
         
     Returns:
         List of detected conditions
     """
-    text_lower = text.lower()
-    
-    condition_keywords = {
-        "Diabetes": ["diabetes", "blood sugar", "glucose", "hba1c", "hyperglycemia", "insulin"],
-        "High Cholesterol": ["cholesterol", "ldl", "hdl", "triglycerides", "lipid"],
-        "Hypertension": ["hypertension", "blood pressure", "bp", "high pressure"],
-        "Anemia": ["anemia", "iron", "hemoglobin", "ferritin", "low iron"],
-        "Thyroid": ["thyroid", "tsh", "t3", "t4", "hypothyroid", "hyperthyroid"],
-        "Kidney": ["kidney", "creatinine", "urea", "renal", "gfr"],
-        "Liver": ["liver", "alt", "ast", "bilirubin", "hepatic"],
-        "Vitamin D Deficiency": ["vitamin d", "vit d", "25-oh"],
-        "Vitamin B12 Deficiency": ["vitamin b12", "b12", "cobalamin"],
-        "Obesity": ["obesity", "bmi", "overweight", "weight loss"],
-        "Heart Disease": ["heart", "cardiac", "cardiovascular", "coronary"],
-        "PCOS": ["pcos", "polycystic", "ovarian"],
-        "Uric Acid": ["uric acid", "gout", "urate"]
-    }
+    text_lower = (text or "").lower()
     
     detected = []
-    
-    for condition, keywords in condition_keywords.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                if condition not in detected:
-                    detected.append(condition)
-                break
+    for condition, keywords in _CONDITION_TABLE:
+        if any(_mentions(text_lower, keyword) for keyword in keywords):
+            detected.append(condition)
     
     return detected if detected else ["General Health"]
+
+
+def extract_conditions_batch(texts):
+    """
+    Extract conditions from many texts: extract_conditions() per text
+    (a convenience for callers with a list - it is not faster).
+    
+    Args:
+        texts: List of texts to analyze
+        
+    Returns:
+        List of condition lists (same order as texts)
+    """
+    return [extract_conditions(text) for text in texts]
+
+
+def _mentions(text, keyword):
+    """True if keyword occurs in text as a whole word and is not negated."""
+    start = text.find(keyword)
+    while start != -1:
+        end = start + len(keyword)
+        if end < len(text) and text[end] == "s":
+            end += 1
+        if ((start == 0 or not text[start - 1].isalnum())
+                and (end == len(text) or not text[end].isalnum())
+                and not _is_negated(text, start, end)):
+            return True
+        start = text.find(keyword, start + 1)
+    return False
+
+
+def _is_negated(text, start, end):
+    """True if the keyword at text[start:end] directly follows or precedes a negation cue."""
+    return bool(_NEGATION_RE.search(text[max(0, start - 40):start])
+                or _NEGATION_AFTER_RE.match(text[end:end + 30]))
@@ -0,0 +1,28 @@
+"""
+File Reader Tests
+=================
+Run with: python -m pytest tests/
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from file_reader import FileReader, detect_format
+
+
+@pytest.mark.parametrize("data", [b"\x00\x01\x02", b"report\x00text", bytes(range(1, 32)) * 4])
+def test_binary_bytes_are_not_text(data):
+    assert detect_format(data) is None
+
+
+def test_text_with_some_control_characters_is_text():
+    assert detect_format("Glucose 186 mg/dL (high)\f\n\x1b[0m".encode("utf-8")) == "txt"
+
+
+@pytest.mark.parametrize("name", ["a.bin", "a.txt"])
+def test_read_file_rejects_binary_content(name):
+    assert FileReader(cache=None).read_file(b"\x00\x01\x02", name=name).startswith("❌")
@@ -0,0 +1,85 @@
+"""
+Lab Parser Tests
+================
+Run with: python -m pytest tests/
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "agents"))
+
+import pytest
+
+from lab_parser import LabValue, parse_lab_values, unparsed_lines
+
+
+def by_name(values):
+    return {v.analyte: v for v in values}
+
+
+def test_sample_pdf():
+    from file_reader import FileReader
+    text = FileReader(pdf_workers=1, cache=None).read_file(os.path.join(ROOT, "my_blood_test.pdf"))
+
+    values = by_name(parse_lab_values(text))
+
+    assert values["Iron"] == LabValue("Iron", 59.0, "µg/dL", 60.0, 180.0, "low")
+    assert values["Vitamin B12"] == LabValue("Vitamin B12", 385.0, "pg/mL", 211.0, 911.0, "normal")
+    assert values["Vitamin D"] == LabValue("Vitamin D", 21.44, "ng/mL", 30.0, 100.0, "low")
+    assert values["Vitamin D2"].value == 2.04
+    assert values["Vitamin D3"].value == 19.4
+
+
+def test_ranges_and_computed_flags():
+    values = by_name(parse_lab_values("Fasting glucose 186 mg/dL (70-99), Hemoglobin 13.1 g/dL (12 - 15)"))
+
+    assert values["Fasting Glucose"] == LabValue("Fasting Glucose", 186.0, "mg/dL", 70.0, 99.0, "high")
+    assert values["Hemoglobin"] == LabValue("Hemoglobin", 13.1, "g/dL", 12.0, 15.0, "normal")
+
+
+@pytest.mark.parametrize("text, low, high, flag", [
+    ("HbA1c 8.2% (<5.7)", None, 5.7, "high"),
+    ("HDL cholesterol 35 mg/dL (>40)", 40.0, None, "low"),
+    ("LDL 90 mg/dL (< 100)", None, 100.0, "normal"),
+])
+def test_one_sided_bounds(text, low, high, flag):
+    (value,) = parse_lab_values(text)
+    assert (value.low, value.high, value.flag) == (low, high, flag)
+
+
+@pytest.mark.parametrize("text, flag", [
+    ("Hemoglobin 10.1 g/dL L", "low"),
+    ("TSH 6.2 mIU/L H", "high"),
+    ("Vitamin D 12 ng/mL deficient", "low"),
+    ("Creatinine 0.9 mg/dL", ""),
+])
+def test_explicit_flags(text, flag):
+    (value,) = parse_lab_values(text)
+    assert value.flag == flag
+
+
+def test_unparsed_lines_keep_findings_without_units():
+    text = ("TEST NAME RESULT UNIT REFERENCE RANGE\n"
+            "Hemoglobin 13.1 g/dL (12-15)\n"
+            "Fasting glucose 92 mg/dL (70-99) Normal\n"
+            "IMPRESSION: Grade II fatty liver\n"
+            "BP 160/100")
+    values = parse_lab_values(text)
+
+    assert unparsed_lines(text, values) == ["IMPRESSION: Grade II fatty liver", "BP 160/100"]
+
+
+def test_agent1_prompt_keeps_lines_the_table_does_not_cover():
+    from agent1_translator import _build_prompt
+    text = ("Patient report - routine check-up, all samples collected fasting in the morning.\n" * 3
+            + "Hemoglobin 13.1 g/dL (12-15)\nFasting glucose 92 mg/dL (70-99)\n"
+            + "IMPRESSION: Grade II fatty liver and a gallbladder stone.\n"
+            + "Blood pressure 160/100 - hypertension stage 2\n")
+
+    prompt = _build_prompt(text, profile={})
+
+    assert "Grade II fatty liver" in prompt
+    assert "160/100" in prompt
@@ -0,0 +1,138 @@
+"""
+Report Manager Tests
+====================
+Run with: python -m pytest tests/
+"""
+
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import report_manager
+
+
+class FakeSessionState(dict):
+    """Stand-in for st.session_state (dict with attribute access)."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+@pytest.fixture
+def session_store(monkeypatch):
+    monkeypatch.setattr(report_manager, "st", types.SimpleNamespace(session_state=FakeSessionState()))
+    return report_manager.SessionReportStore()
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    return report_manager.SQLiteReportStore(str(tmp_path / "reports.sqlite"))
+
+
+@pytest.fixture
+def file_store(tmp_path):
+    return report_manager.FileReportStore(str(tmp_path / "reports"))
+
+
+def make_report(report_id, **fields):
+    report = report_manager.build_report("Fasting glucose 186 mg/dL", "High blood sugar.", "Eat more fiber.", "Day 1: oats")
+    report.update(report_id=report_id, **fields)
+    return report
+
+
+@pytest.mark.parametrize("store_name", ["session_store", "sqlite_store"])
+def test_delete_keeps_blobs_shared_between_fields(store_name, request):
+    store = request.getfixturevalue(store_name)
+    store.add(make_report(10, diet_recommendations="", meal_plan=""))
+    store.add(make_report(11, diet_recommendations="", meal_plan=""))
+
+    store.delete(11)
+
+    report = store.get(10)
+    assert report["diet_recommendations"] == ""
+    assert report["meal_plan"] == ""
+
+
+def test_session_delete_releases_all_blobs(session_store):
+    session_store.add(make_report(10, diet_recommendations="", meal_plan=""))
+    session_store.add(make_report(11, diet_recommendations="", meal_plan=""))
+
+    session_store.delete(10)
+    session_store.delete(11)
+
+    assert report_manager.st.session_state.report_blobs == {}
+
+
+@pytest.mark.parametrize("store_name", ["session_store", "sqlite_store", "file_store"])
+def test_add_after_import_from_the_future_stays_newest(store_name, request):
+    store = request.getfixturevalue(store_name)
+    now = int(report_manager.time.time())
+    assert store.add(make_report(now + 5000), keep_id=True) == now + 5000
+
+    report_id = store.add(make_report(now))
+
+    assert report_id == now + 5001
+    assert store.get(report_id)["report_id"] == report_id
+    assert [s["report_id"] for s in store.page(10)] == [now + 5001, now + 5000]
+
+
+@pytest.mark.parametrize("text", [
+    "Pulse 72 bpm",
+    "Use less salt when cooking",
+    "Swap saturated fats for olive oil",
+    "Have breakfast before 9 AM",
+])
+def test_keywords_inside_other_words_do_not_match(text):
+    assert report_manager.extract_conditions(text) == ["General Health"]
+
+
+@pytest.mark.parametrize("text, condition", [
+    ("Not enough iron in your blood", "Anemia"),
+    ("There is no doubt your cholesterol is high", "High Cholesterol"),
+    ("no sugar drinks help glucose control", "Diabetes"),
+    ("You do not have enough vitamin B12", "Vitamin B12 Deficiency"),
+    ("Your blood pressure is high", "Hypertension"),
+])
+def test_findings_near_negation_words_are_kept(text, condition):
+    assert condition in report_manager.extract_conditions(text)
+
+
+@pytest.mark.parametrize("text", [
+    "No diabetes",
+    "Negative for anemia",
+    "No signs of thyroid disease",
+    "Patient denies kidney problems",
+    "Anemia was ruled out",
+])
+def test_negated_mentions_are_ignored(text):
+    assert report_manager.extract_conditions(text) == ["General Health"]
+
+
+def test_file_store_reimports_a_report_deleted_from_a_jsonl_file(tmp_path):
+    import json
+    from report_archive import import_reports
+
+    directory = tmp_path / "reports"
+    directory.mkdir()
+    report = make_report(10)
+    (directory / "batch.jsonl").write_text(json.dumps(report) + "\n", encoding="utf-8")
+    store = report_manager.FileReportStore(str(directory))
+    store.delete(10)
+    assert store.get(10) is None
+
+    export = tmp_path / "export.jsonl"
+    export.write_text(json.dumps(report) + "\n", encoding="utf-8")
+    assert import_reports(str(export), store) == {"imported": 1, "skipped": 0, "failed": 0}
+
+    assert store.get(10)["report_id"] == 10
+    assert report_manager.FileReportStore(str(directory)).get(10)["report_id"] == 10
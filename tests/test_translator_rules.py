@@ -0,0 +1,67 @@
+"""
+Translator Rules Tests
+======================
+Run with: python -m pytest tests/
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from translator_rules import translate_fast, SHORT_TEXT
+
+
+HEADER = """TEST REPORT
+Name : Ms. A Patient
+Age/Gender : 41 Years / Female
+Ref. By : Dr. B Physician
+Collected on : 25-Sep-2025 09:57
+Sample Type : Serum
+TEST NAME RESULT UNIT BIOLOGICAL REFERENCE INTERVAL
+"""
+LABS = """Hemoglobin 13.1 g/dL (12-15)
+Fasting glucose 92 mg/dL (70-99)
+"""
+FOOTER = "Page 1 of 1\n" + "------------------ End of Report ------------------\n" * 8
+
+
+def test_long_report_with_a_diagnosis_goes_to_the_llm():
+    text = (HEADER + LABS + "IMPRESSION: Ultrasound abdomen shows Grade II fatty liver and a gallbladder stone.\n"
+            "Blood pressure 160/100 - hypertension stage 2\n" + FOOTER)
+    assert len(text) > SHORT_TEXT
+    assert translate_fast(text) is None
+
+
+def test_long_report_with_only_values_and_boilerplate_uses_rules():
+    text = HEADER + LABS + FOOTER
+    assert len(text) > SHORT_TEXT
+    result = translate_fast(text)
+    assert result is not None
+    assert "Nothing in these results is out of range." in result
+
+
+def test_short_note_with_low_iron_and_b12():
+    result = translate_fast("i have less iron and vitamin b deficiency")
+    assert result is not None
+    assert "low iron and low vitamin B12" in result
+
+
+@pytest.mark.parametrize("note", [
+    "i don't have diabetes",
+    "no iron deficiency",
+    "doctor said not diabetic",
+])
+def test_negated_notes_go_to_the_llm(note):
+    assert translate_fast(note) is None
+
+
+def test_values_in_another_unit_go_to_the_llm():
+    assert translate_fast("Fasting glucose 6.1 mmol/L") is None
+
+
+def test_short_lab_values_are_flagged_from_the_reference_table():
+    result = translate_fast("Fasting glucose 186 mg/dL")
+    assert "high fasting blood sugar" in result
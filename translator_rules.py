@@ -0,0 +1,332 @@
+"""
+Translator Rules - Rule-Based Fast Path for Agent 1
+===================================================
+Many inputs only contain well-known findings: a few lab values from
+lab_parser.py, or notes like "i have less iron and vitamin b deficiency".
+For those, translate_fast() fills Agent 1's answer format
+("What Your Report Shows / What This Means For You / Key Numbers /
+Next Steps") from a local reference table in milliseconds.
+
+It returns None - and Agent 1 calls the LLM as before - whenever any
+part of the input can't be classified.
+"""
+
+import re
+from lab_parser import parse_lab_values, unparsed_lines, ANALYTES, UNIT_RE
+
+
+# Adult reference ranges and plain-language notes, by lab_parser name.
+# low/high = normal range bounds (None = no bound on that side)
+REFERENCE = {
+    "Fasting Glucose": dict(low=70, high=99, unit="mg/dL", label="fasting blood sugar",
+                            high_note="High fasting sugar means your body is not handling sugar well, which can lead to diabetes.",
+                            low_note="Low blood sugar can make you shaky, sweaty and tired.",
+                            high_step="Cut down on sugar and white flour, and ask your doctor about a diabetes check."),
+    "Post-meal Glucose": dict(low=None, high=140, unit="mg/dL", label="blood sugar after meals",
+                              high_note="Sugar stays high after meals, an early sign of diabetes.",
+                              high_step="Eat smaller portions of rice and bread and walk after meals."),
+    "Random Glucose": dict(low=70, high=140, unit="mg/dL", label="blood sugar",
+                           high_note="Your blood sugar is higher than it should be.",
+                           low_note="Low blood sugar can make you shaky, sweaty and tired.",
+                           high_step="Ask your doctor for a fasting sugar or HbA1c test."),
+    "Glucose": dict(low=70, high=140, unit="mg/dL", label="blood sugar",
+                    high_note="Your blood sugar is higher than it should be, which can lead to diabetes.",
+                    low_note="Low blood sugar can make you shaky, sweaty and tired.",
+                    high_step="Cut down on sugar and white flour, and ask your doctor about a diabetes check.",
+                    low_step="Eat regular meals and keep a quick snack with you."),
+    "HbA1c": dict(low=None, high=5.7, unit="%", label="3-month average blood sugar (HbA1c)",
+                  high_note="Your average sugar over the last 3 months is high, a sign of prediabetes or diabetes.",
+                  high_step="Talk to your doctor about a plan to bring your sugar down."),
+    "Total Cholesterol": dict(low=None, high=200, unit="mg/dL", label="total cholesterol",
+                              high_note="High cholesterol can slowly clog blood vessels and strain your heart.",
+                              high_step="Choose less fried food and more fiber, and recheck in 3 months."),
+    "LDL Cholesterol": dict(low=None, high=100, unit="mg/dL", label="LDL (bad) cholesterol",
+                            high_note="High bad cholesterol can slowly clog blood vessels and strain your heart.",
+                            high_step="Choose less fried food and more fiber, and recheck in 3 months."),
+    "HDL Cholesterol": dict(low=40, high=None, unit="mg/dL", label="HDL (good) cholesterol",
+                            low_note="Low good cholesterol gives your heart less protection.",
+                            low_step="Regular exercise and healthy fats like nuts and fish can raise it."),
+    "Triglycerides": dict(low=None, high=150, unit="mg/dL", label="triglycerides (blood fats)",
+                          high_note="High blood fats raise the risk of heart problems.",
+                          high_step="Cut down on sweets, sugary drinks and alcohol."),
+    "Hemoglobin": dict(low=12, high=17.5, unit="g/dL", label="hemoglobin",
+                       low_note="Low hemoglobin (anemia) means your blood carries less oxygen, so you may feel tired and weak.",
+                       high_note="High hemoglobin can make the blood thicker.",
+                       low_step="Eat iron-rich foods and ask your doctor if you need an iron check."),
+    "Iron": dict(low=60, high=170, unit="µg/dL", label="iron",
+                 low_note="Low iron can make you feel tired and weak because your blood carries less oxygen.",
+                 high_note="Too much iron can build up in the body over time.",
+                 low_step="Eat more iron-rich foods (leafy greens, lentils, meat) with vitamin C, and ask your doctor about supplements."),
+    "Ferritin": dict(low=15, high=150, unit="ng/mL", label="ferritin (iron stores)",
+                     low_note="Your iron stores are low, which can lead to anemia.",
+                     low_step="Eat more iron-rich foods with vitamin C, and ask your doctor about supplements."),
+    "Vitamin B12": dict(low=211, high=911, unit="pg/mL", label="vitamin B12",
+                        low_note="Low vitamin B12 can cause tiredness, tingling in hands and feet, and poor memory.",
+                        high_note="High vitamin B12 is usually from supplements.",
+                        low_step="Include B12 sources like dairy, eggs, fish or fortified foods, and ask your doctor about supplements."),
+    "Vitamin D": dict(low=30, high=100, unit="ng/mL", label="vitamin D",
+                      low_note="Low vitamin D can weaken bones and make you feel tired.",
+                      high_note="Very high vitamin D is usually from too many supplements.",
+                      low_step="Get 15-20 minutes of morning sunlight and ask your doctor about vitamin D supplements."),
+    "TSH": dict(low=0.4, high=4.5, unit="mIU/L", label="thyroid hormone signal (TSH)",
+                high_note="High TSH usually means a slow thyroid, which can cause tiredness and weight gain.",
+                low_note="Low TSH usually means an overactive thyroid, which can cause weight loss and a fast heartbeat.",
+                high_step="Ask your doctor about a full thyroid check.",
+                low_step="Ask your doctor about a full thyroid check."),
+    "Creatinine": dict(low=0.6, high=1.3, unit="mg/dL", label="creatinine (kidney function)",
+                       high_note="High creatinine can mean your kidneys are not filtering well.",
+                       high_step="Drink enough water and ask your doctor to check your kidney function."),
+    "Urea": dict(low=15, high=45, unit="mg/dL", label="urea (kidney function)",
+                 high_note="High urea can mean your kidneys are under strain or you are dehydrated.",
+                 high_step="Drink enough water and ask your doctor to check your kidney function."),
+    "Uric Acid": dict(low=3.5, high=7.2, unit="mg/dL", label="uric acid",
+                      high_note="High uric acid can cause painful joints (gout).",
+                      high_step="Limit red meat, organ meat and sugary drinks, and drink more water."),
+    "Calcium": dict(low=8.5, high=10.5, unit="mg/dL", label="calcium",
+                    low_note="Low calcium can weaken bones and cause muscle cramps.",
+                    high_note="High calcium should be checked by your doctor.",
+                    low_step="Include calcium-rich foods like milk, curd, ragi and leafy greens."),
+    "Blood Pressure": dict(low=None, high=None, unit="", label="blood pressure",
+                           high_note="High blood pressure strains your heart and blood vessels.",
+                           low_note="Low blood pressure can make you dizzy.",
+                           high_step="Use less salt and ask your doctor how often to check your pressure."),
+}
+
+# Parts of a total that are reported with it (only the total is explained)
+COMPONENTS = {"Vitamin D2": "Vitamin D", "Vitamin D3": "Vitamin D"}
+
+# Everyday words for a lab test or condition -> (REFERENCE name, implied flag or None)
+SUBJECTS = {
+    "iron": ("Iron", None), "hemoglobin": ("Hemoglobin", None), "haemoglobin": ("Hemoglobin", None),
+    "hb": ("Hemoglobin", None), "ferritin": ("Ferritin", None),
+    "vitamin b12": ("Vitamin B12", None), "vitamin b": ("Vitamin B12", None), "b12": ("Vitamin B12", None),
+    "vit b12": ("Vitamin B12", None), "vitamin d": ("Vitamin D", None), "vit d": ("Vitamin D", None),
+    "sugar": ("Glucose", None), "blood sugar": ("Glucose", None), "glucose": ("Glucose", None),
+    "hba1c": ("HbA1c", None), "cholesterol": ("Total Cholesterol", None), "ldl": ("LDL Cholesterol", None),
+    "hdl": ("HDL Cholesterol", None), "triglycerides": ("Triglycerides", None), "uric acid": ("Uric Acid", None),
+    "calcium": ("Calcium", None), "tsh": ("TSH", None), "creatinine": ("Creatinine", None),
+    "blood pressure": ("Blood Pressure", None), "bp": ("Blood Pressure", None),
+    "anemia": ("Hemoglobin", "low"), "anaemia": ("Hemoglobin", "low"), "anemic": ("Hemoglobin", "low"),
+    "diabetes": ("Glucose", "high"), "diabetic": ("Glucose", "high"), "prediabetes": ("HbA1c", "high"),
+    "hypertension": ("Blood Pressure", "high"), "hypothyroid": ("TSH", "high"),
+    "hypothyroidism": ("TSH", "high"), "hyperthyroid": ("TSH", "low"), "hyperthyroidism": ("TSH", "low"),
+    "gout": ("Uric Acid", "high"),
+}
+
+DIRECTIONS = {
+    "low": "low", "less": "low", "lack": "low", "lacking": "low", "deficient": "low", "deficiency": "low",
+    "insufficient": "low", "insufficiency": "low", "decreased": "low", "reduced": "low", "not enough": "low",
+    "high": "high", "elevated": "high", "raised": "high", "increased": "high", "excess": "high",
+    "too much": "high", "more": "high",
+}
+
+# Words that carry no finding of their own
+FILLER = set("""
+i im i'm me my mine have has had having is are was were be been am the a an of in on with and also
+very slightly mild mildly some bit little level levels test tests result results report shows show
+showed doctor said told says blood serum my value values count but too so quite bit a lot
+""".split())
+
+# Typed notes up to this length must be fully classified word by word
+SHORT_TEXT = 600
+
+# Report lines that carry no finding: header fields, page furniture.
+# Longer texts may only have these besides the parsed values.
+_BOILERPLATE_RE = re.compile(
+    r"^\W*(?:patient(?: name)?|name|age|sex|gender|age\s*/\s*(?:sex|gender)|date|ref\.? ?by|referred by|"
+    r"(?:collected|registered|received|reported|released|printed) on|sample(?: type)?|specimen|"
+    r"registration (?:no|id)|lab (?:no|id)|test name|test report|method|page \d+ of \d+|end of report)"
+    r"\b\W*(?::.*)?$"
+    # Column headings of the results table
+    r"|^(?:\W*(?:test|name|investigation|parameter|result|observed|value|units?|biological|reference|ref|"
+    r"range|interval|flag|method|specimen)\b)+\W*$",
+    re.IGNORECASE
+)
+
+_SUBJECT_RE = re.compile(r"\b(" + "|".join(re.escape(s) for s in sorted(SUBJECTS, key=len, reverse=True)) + r")\b")
+_DIRECTION_RE = re.compile(r"\b(" + "|".join(re.escape(d) for d in sorted(DIRECTIONS, key=len, reverse=True)) + r")\b")
+_CLAUSE_SPLIT_RE = re.compile(r"[.,;:\n!?]+|\band\b|\bbut\b|\bwith\b")
+_SENTENCE_SPLIT_RE = re.compile(r"[.;\n!?]+")
+_WORD_RE = re.compile(r"[a-z][a-z0-9']*")
+_ANALYTE_WORDS = {word for aliases in ANALYTES.values() for alias in aliases for word in _WORD_RE.findall(alias)}
+
+
+def _qualitative_findings(text):
+    """
+    Findings from notes like 'low iron and vitamin b deficiency'.
+
+    Returns:
+        List of (name, flag), or None if some clause can't be classified
+    """
+    findings = []
+    for sentence in _SENTENCE_SPLIT_RE.split(text.lower()):
+        direction = None
+        pending = []  # subjects waiting for a direction ("iron and b12 are low")
+        for clause in _CLAUSE_SPLIT_RE.split(sentence):
+            clause = clause.strip()
+            if not clause:
+                continue
+            subjects = [SUBJECTS[m.group(1)] for m in _SUBJECT_RE.finditer(clause)]
+            directions = [DIRECTIONS[m.group(1)] for m in _DIRECTION_RE.finditer(clause)]
+            leftover = _DIRECTION_RE.sub(" ", _SUBJECT_RE.sub(" ", clause))
+            if any(word not in FILLER for word in _WORD_RE.findall(leftover)):
+                return None
+            if directions:
+                direction = directions[0]
+            if direction and pending:
+                findings.extend((name, direction) for name in pending)
+                pending = []
+            for name, implied in subjects:
+                if implied or direction:
+                    findings.append((name, implied or direction))
+                else:
+                    pending.append(name)
+        if pending:
+            return None
+    return findings
+
+
+# Spellings of the same unit (lowercase) -> the spelling REFERENCE uses
+UNIT_ALIASES = {"ug/dl": "µg/dl", "mcg/dl": "µg/dl", "uiu/ml": "µiu/ml", "umol/l": "µmol/l"}
+
+
+def _same_unit(unit, reference_unit):
+    """True if a parsed unit is the reference unit (case-insensitive, µ/u/mcg spellings)."""
+    unit, reference_unit = unit.lower(), reference_unit.lower()
+    return UNIT_ALIASES.get(unit, unit) == UNIT_ALIASES.get(reference_unit, reference_unit)
+
+
+def _classify_values(text, values):
+    """
+    (name, flag, LabValue) for parsed lab values, or None if any value
+    has no known range, is in a unit the reference range isn't (e.g.
+    glucose in mmol/L) or the text holds anything besides them: other
+    measurements, or (in longer reports) lines like an impression or a
+    diagnosis that lab_parser.unparsed_lines() keeps.
+    """
+    if len(UNIT_RE.findall(text)) > len(values):
+        return None
+    if len(text) > SHORT_TEXT:
+        if any(not _BOILERPLATE_RE.match(line) for line in unparsed_lines(text, values)):
+            return None
+    else:
+        # Typed notes: every word must belong to a recognized value
+        words = _WORD_RE.findall(UNIT_RE.sub(" ", text.lower()))
+        flag_words = {"h", "l", "high", "low", "normal", "deficient", "elevated", "fasting", "total", "serum"}
+        if any(w not in FILLER and w not in _ANALYTE_WORDS and w not in flag_words and w not in DIRECTIONS
+               for w in words):
+            return None
+
+    names = {v.analyte for v in values}
+    findings = []
+    for v in values:
+        if COMPONENTS.get(v.analyte) in names:
+            continue
+        reference = REFERENCE.get(v.analyte)
+        flag = v.flag
+        if not flag and reference:
+            if v.unit and not _same_unit(v.unit, reference["unit"]):
+                return None  # no conversion table - let the LLM read it
+            if reference["low"] is not None and v.value < reference["low"]:
+                flag = "low"
+            elif reference["high"] is not None and v.value > reference["high"]:
+                flag = "high"
+            else:
+                flag = "normal"
+        if not flag:
+            return None
+        findings.append((v.analyte, flag, v))
+    return findings
+
+
+def _range_text(low, high, unit):
+    if low is not None and high is not None:
+        text = f"{low:g}-{high:g}"
+    elif high is not None:
+        text = f"below {high:g}"
+    elif low is not None:
+        text = f"above {low:g}"
+    else:
+        return ""
+    return f"{text} {unit}".strip()
+
+
+def _join(items):
+    return items[0] if len(items) == 1 else ", ".join(items[:-1]) + " and " + items[-1]
+
+
+def translate_fast(medical_text):
+    """
+    Agent 1's answer built from rules, when every finding is recognized.
+
+    Args:
+        medical_text: Raw medical report text
+
+    Returns:
+        Markdown in Agent 1's format, or None to fall back to the LLM
+    """
+    text = (medical_text or "").strip()
+    if not text:
+        return None
+
+    values = parse_lab_values(text)
+    if values:
+        findings = _classify_values(text, values)
+    else:
+        qualitative = _qualitative_findings(text) if len(text) <= SHORT_TEXT else None
+        findings = [(name, flag, None) for name, flag in qualitative] if qualitative else None
+    if not findings:
+        return None
+
+    # One entry per test, abnormal first
+    seen = set()
+    unique = []
+    for name, flag, value in findings:
+        if name in REFERENCE and name not in seen:
+            seen.add(name)
+            unique.append((name, flag, value))
+        elif name not in REFERENCE:
+            return None
+    unique.sort(key=lambda f: f[1] == "normal")
+    abnormal = [f for f in unique if f[1] != "normal"]
+    normal = [f for f in unique if f[1] == "normal"]
+
+    shows = []
+    if abnormal:
+        shows.append("Your report shows " + _join([f"{flag} {REFERENCE[name]['label']}" for name, flag, _ in abnormal]) + ".")
+    if normal:
+        shows.append("Your " + _join([REFERENCE[name]["label"] for name, _, _ in normal[:3]]) +
+                     (" is" if len(normal[:3]) == 1 else " are") + " in the normal range.")
+    if not abnormal:
+        shows.append("Nothing in these results is out of range.")
+
+    means = [REFERENCE[name].get(f"{flag}_note") for name, flag, _ in abnormal]
+    means = [m for m in means if m][:3] or ["Your results look healthy - keep up your current habits."]
+
+    key_numbers = []
+    for name, flag, value in unique[:4]:
+        reference = REFERENCE[name]
+        title = value.analyte if value else name
+        if value and (value.low is not None or value.high is not None):
+            normal_range = _range_text(value.low, value.high, value.unit)
+        else:
+            normal_range = _range_text(reference["low"], reference["high"], reference["unit"])
+        normal_part = f" - normal is {normal_range}" if normal_range else ""
+        if value:
+            key_numbers.append(f"- {title}: {value.value:g} {value.unit}".rstrip() + f" ({flag.capitalize()}{normal_part})")
+        else:
+            key_numbers.append(f"- {title}: {flag.capitalize()}" + (f" (normal is {normal_range})" if normal_range else ""))
+
+    steps = []
+    for name, flag, _ in abnormal:
+        step = REFERENCE[name].get(f"{flag}_step")
+        if step and step not in steps:
+            steps.append(step)
+    steps = steps[:2] + ["Share these results with your doctor before starting any medicines or supplements."]
+
+    return (
+        "**What Your Report Shows:**\n" + " ".join(shows) + "\n\n"
+        "**What This Means For You:**\n" + " ".join(means) + "\n\n"
+        "**Key Numbers:**\n" + "\n".join(key_numbers) + "\n\n"
+        "**Next Steps:**\n" + " ".join(steps)
+    )